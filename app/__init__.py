@@ -2,19 +2,23 @@
 from .api.ranker import router as ranker
 from .api.scheduler import router as scheduler
 from .api.parser import router as parser
-from .core.configs import config
+from .core.configs import config, get_settings
 from .core.temporal_ranker import PeriodicResumeRanker
 from .services.mongoDB_service import MongoService
-from .services.agent_registry import AgentRegistry
+from .services.agent_registry import AgentRegistry, agent_registry
 from .services.multi_job import ResumeRanker
+from .services.Interview_manager import InterviewManager
 
 __all__ = [
     "ranker", 
     "scheduler",
     "parser",
     "config",
+    "get_settings",
     "MongoService",
     "AgentRegistry",
+    "agent_registry",
     "ResumeRanker",
     "PeriodicResumeRanker",
+    "InterviewManager",
     ]
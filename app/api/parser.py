@@ -1,23 +1,129 @@
 import asyncio
-import uuid
+import contextlib
 import os
-from fastapi import APIRouter, UploadFile, File, HTTPException, status
-from fastapi.responses import JSONResponse
+import aiofiles
+from cachetools import TTLCache
+from fastapi import APIRouter, BackgroundTasks, UploadFile, File, HTTPException, Request, status
+from fastapi.responses import ORJSONResponse
 import tempfile
 import shutil
-from typing import List
+from typing import Any, Dict, List, Optional, Tuple
 import random
 from fastapi import Query
-from app.services.resume_parser import ResumeProcessor
+from bson import ObjectId
+from app.core.configs import config
+from app.services.resume_parser import ResumeProcessor, is_transient_error
+from app.helpers.circuit_breaker import CircuitBreaker
 import logging
 
 router = APIRouter()
 logger = logging.getLogger("resume_async")
 logger.setLevel(logging.INFO)
 
+# resume formats the GenAI parser accepts; uploads without an extension are treated as .pdf
+ALLOWED_RESUME_EXTENSIONS = frozenset({".pdf", ".docx", ".doc"})
+
+# bytes read from an UploadFile per iteration; keeps peak memory per upload bounded
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# parsed resumes accumulated before one bulk_write in the bulk endpoint
+BULK_WRITE_BATCH_SIZE = 200
+
+# decorrelated-jitter retry delays (seconds): sleep = min(cap, uniform(base, prev_sleep * 3))
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 30.0
+
+# one breaker per GenAI api_key, shared by every request using that key
+# (api_key is client supplied: bounded; get_breaker re-inserts on use, so only idle keys expire)
+_breakers: TTLCache = TTLCache(maxsize=config.GENAI_CLIENT_CACHE_SIZE, ttl=config.GENAI_CLIENT_CACHE_TTL)
+
+# bulkhead shared by every request; created on first use inside the running loop
+_genai_sem: Optional[asyncio.Semaphore] = None
+
+
+def get_genai_semaphore() -> asyncio.Semaphore:
+    """Return the process-wide semaphore bounding concurrent GenAI parses (GLOBAL_GENAI_CONC)."""
+    global _genai_sem
+    if _genai_sem is None:
+        _genai_sem = asyncio.Semaphore(config.GLOBAL_GENAI_CONC)
+    return _genai_sem
+
+
+def get_breaker(api_key: str) -> CircuitBreaker:
+    """Return the process-wide circuit breaker guarding the GenAI provider for `api_key`."""
+    breaker = _breakers.get(api_key)
+    if breaker is None:
+        breaker = CircuitBreaker(name="genai", failure_threshold=3, reset_timeout=30.0)
+    # TTLCache expires by insertion time; re-inserting restarts the TTL so a busy (possibly OPEN)
+    # breaker isn't dropped and recreated CLOSED mid-use
+    _breakers[api_key] = breaker
+    return breaker
+
+
+def _upload_error(upload: UploadFile) -> Optional[HTTPException]:
+    """Cheap per-file checks run before any disk or model work; returns the error to raise, if any."""
+    suffix = os.path.splitext(upload.filename or "")[1].lower() or ".pdf"
+    if suffix not in ALLOWED_RESUME_EXTENSIONS:
+        return HTTPException(status_code=415, detail=f"Unsupported file type '{suffix}'")
+    if upload.size is not None and upload.size > config.MAX_UPLOAD_BYTES:
+        return HTTPException(status_code=413, detail=f"File too large. Max allowed is {config.MAX_UPLOAD_BYTES} bytes")
+    return None
+
+
+def _validate_owner_id(owner_id: str) -> None:
+    if not ObjectId.is_valid(owner_id):
+        raise HTTPException(status_code=400, detail=f"Invalid owner_id: {owner_id}")
+
+
+def _validate_upload(upload: UploadFile, owner_id: str) -> None:
+    """Fail fast with a 4xx on inputs that would be rejected after the expensive GenAI call."""
+    _validate_owner_id(owner_id)
+    error = _upload_error(upload)
+    if error is not None:
+        raise error
+
+
+async def _save_upload_to_temp_file(upload: UploadFile, dir: Optional[str] = None) -> str:
+    """
+    Copy an UploadFile chunk by chunk into a new mkstemp file (0600, unique name) and return its path.
+    The fd is written unbuffered, so each chunk goes straight to os.write without an extra copy.
+    """
+    suffix = os.path.splitext(upload.filename or "")[1] or ".pdf"
+    fd, path = tempfile.mkstemp(suffix=suffix, dir=dir)
+    try:
+        async with aiofiles.open(fd, "wb", buffering=0) as f:
+            while chunk := await upload.read(UPLOAD_CHUNK_SIZE):
+                view = memoryview(chunk)
+                # raw writes may be partial
+                while view:
+                    view = view[await f.write(view):]
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(path)
+        raise
+    return path
+
+
+def _remove_dir(path: str) -> None:
+    """Remove a temp directory tree; run as a background task after the response is sent."""
+    try:
+        shutil.rmtree(path)
+    except Exception:
+        logger.warning("Failed to remove temp dir %s", path)
+
+
+def get_processor(request: Request, api_key: str) -> ResumeProcessor:
+    """Return the ResumeProcessor cached on app state for `api_key`, creating it on first use."""
+    processors = request.app.state.processors
+    processor = processors.get(api_key)
+    if processor is None:
+        processor = processors[api_key] = ResumeProcessor(api_key=api_key)
+    return processor
+
+
 #  FastAPI endpoint
 @router.post("/upload-resume")
-async def upload_resume(file: UploadFile = File(...), owner_id: str = "60c72b2f5f1b2c001f0a1234",api_key:str=None):
+async def upload_resume(request: Request, file: UploadFile = File(...), owner_id: str = "60c72b2f5f1b2c001f0a1234",api_key:str=None):
     """
     Upload a resume file (multipart/form-data). The file is temporarily saved on disk,
     processed asynchronously (GenAI + Mongo), then deleted.
@@ -29,40 +135,60 @@ async def upload_resume(file: UploadFile = File(...), owner_id: str = "60c72b2f5
             detail="Server misconfiguration: GOOGLE_API_KEY not set",
         )
 
-    # Save uploaded file to temp path
-    suffix = os.path.splitext(file.filename)[1] or ".pdf"
-    tmp_name = f"{uuid.uuid4().hex}{suffix}"
-    tmp_path = os.path.join("/tmp", tmp_name) if os.name != "nt" else os.path.join(os.getenv("TEMP", "."), tmp_name)
+    _validate_upload(file, owner_id)
+
+    # fail fast while the provider is known to be down, before spending disk I/O on the upload
+    breaker = get_breaker(api_key)
+    if not breaker.allow():
+        raise HTTPException(status_code=503, detail="Upstream model unavailable. Please retry later.")
 
+    # Save uploaded file to temp path
     try:
-        with open(tmp_path, "wb") as f:
-            content = await file.read()
-            f.write(content)
+        tmp_path = await _save_upload_to_temp_file(file)
     except Exception as e:
+        # no provider call was made: hand back a HALF_OPEN probe slot so other callers aren't blocked
+        breaker.release()
         logger.exception("Failed to save uploaded file: %s", e)
         raise HTTPException(status_code=500, detail="Failed to save uploaded file")
 
-    processor = ResumeProcessor(api_key=api_key)
+    processor = get_processor(request, api_key)
 
     prompt = "Parse this document and extract the resume information according to the provided schema."
 
     try:
-        result = await processor.process_resume_file(local_path=tmp_path, owner_id=owner_id, prompt=prompt)
+        # only the GenAI parse reports to the breaker; a Mongo outage must not open the model circuit
+        try:
+            async with get_genai_semaphore():
+                uploaded_doc, resume_model = await processor.parse_resume_file(local_path=tmp_path, prompt=prompt)
+            breaker.record_success()
+        except Exception as exc:
+            is_transient = is_transient_error(exc)
+            if is_transient:
+                # expected upstream outage: one line, no traceback formatting on the hot failure path
+                logger.warning("Processing failed (transient): %s", exc)
+                breaker.record_failure()
+                raise HTTPException(status_code=503, detail="Upstream model unavailable. Please retry later.")
+            logger.exception("Processing failed: %s", exc)
+            breaker.record_success()
+            raise HTTPException(status_code=500, detail=f"Processing failed: {str(exc)}")
+
+        try:
+            saved_doc = await processor.upsert_to_db(owner_id=owner_id, parsed_resume=resume_model)
+        except Exception as exc:
+            if is_transient_error(exc):
+                logger.warning("Saving parsed resume failed (transient): %s", exc)
+                raise HTTPException(status_code=503, detail="Database unavailable. Please retry later.")
+            logger.exception("Saving parsed resume failed: %s", exc)
+            raise HTTPException(status_code=500, detail=f"Processing failed: {str(exc)}")
 
         # Optionally return compact response
-        return JSONResponse(status_code=200, content={
+        return ORJSONResponse(status_code=200, content={
             "status": "ok",
-            "uploaded_filename": result.get("uploaded_doc"),
-            "candidate_phone": result.get("candidate_phone"),
-            "db_saved": result.get("db_saved"),
-            "db_doc_id": str(result.get("db_doc").get("_id")) if result.get("db_doc") and result.get("db_doc").get("_id") else None
+            "uploaded_filename": getattr(uploaded_doc, "name", None),
+            "candidate_phone": getattr(resume_model, "phone", None),
+            "db_saved": bool(saved_doc),
+            "db_doc_id": str(saved_doc.get("_id")) if saved_doc and saved_doc.get("_id") else None
         })
-    except Exception as exc:
-        logger.exception("Processing failed: %s", exc)
-        # Provide helpful error classification to clients
-        if "model is overloaded" in str(exc).lower() or "503" in str(exc).lower() or "unavailable" in str(exc).lower():
-            raise HTTPException(status_code=503, detail="Upstream model unavailable. Please retry later.")
-        raise HTTPException(status_code=500, detail=f"Processing failed: {str(exc)}")
     finally:
         # always try to clean up temp file
         try:
@@ -75,6 +201,8 @@ async def upload_resume(file: UploadFile = File(...), owner_id: str = "60c72b2f5
 # Bulk endpoint
 @router.post("/upload-resumes-bulk")
 async def upload_resumes_bulk(
+    request: Request,
+    background_tasks: BackgroundTasks,
     files: List[UploadFile] = File(...),
     owner_id: str = "60c72b2f5f1b2c001f0a1234",
     retry_attempts: int = Query(3, ge=1, le=10),
@@ -97,22 +225,30 @@ async def upload_resumes_bulk(
     if not files:
         raise HTTPException(status_code=400, detail="No files uploaded")
 
-    # create processor once and reuse client connections
-    processor = ResumeProcessor(api_key=api_key)
+    # bound the batch before touching the disk
+    if len(files) > config.MAX_BULK_RESUMES:
+        raise HTTPException(status_code=413, detail=f"Too many files. Max allowed is {config.MAX_BULK_RESUMES}")
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > config.MAX_BULK_RESUMES * config.MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail="Request body too large")
+
+    _validate_owner_id(owner_id)
+
+    # reuse the shared processor (and its client connections) for this api_key
+    processor = get_processor(request, api_key)
+    breaker = get_breaker(api_key)
 
+    # `concurrency` bounds this request; the global semaphore bounds all requests together
     sem = asyncio.Semaphore(concurrency)
+    genai_sem = get_genai_semaphore()
 
     # ensure a working temp dir for all files (will be cleaned up)
     tmp_dir = tempfile.mkdtemp(prefix="resume_bulk_")
 
     async def _save_upload_to_temp(upload: UploadFile) -> str:
         """Save UploadFile to a temp path and return the path."""
-        suffix = os.path.splitext(upload.filename)[1] or ".pdf"
-        tmp_path = os.path.join(tmp_dir, f"{uuid.uuid4().hex}{suffix}")
         try:
-            with open(tmp_path, "wb") as f:
-                content = await upload.read()
-                f.write(content)
+            tmp_path = await _save_upload_to_temp_file(upload, dir=tmp_dir)
         except Exception as e:
             logger.exception("Failed saving upload %s: %s", upload.filename, e)
             raise
@@ -120,32 +256,45 @@ async def upload_resumes_bulk(
 
     async def _process_with_attempts(local_path: str, original_filename: str):
         """
-        Tries to process the file up to `retry_attempts`. Returns a dict result.
-        Retries are for the full pipeline (upload -> generate -> validate -> db).
+        Tries to parse the file up to `retry_attempts`. Returns (result dict, parsed resume or None).
+        Retries are for the parse pipeline (upload -> generate -> validate); DB writes are
+        batched separately via _flush.
         """
         last_error = None
+        prev_sleep = RETRY_BASE_DELAY
         for attempt in range(1, retry_attempts + 1):
+            if not breaker.allow():
+                # provider is down: fail this file immediately instead of adding to the retry storm
+                return {
+                    "filename": original_filename,
+                    "success": False,
+                    "attempts": attempt - 1,
+                    "error": str(last_error) if last_error else "Upstream model unavailable (circuit open)",
+                }, None
             try:
-                # Use semaphore to bound concurrent access to model & DB
-                async with sem:
-                    result = await processor.process_resume_file(
+                # Use semaphores to bound concurrent access to the model
+                async with sem, genai_sem:
+                    _, resume_model = await processor.parse_resume_file(
                         local_path=local_path,
-                        owner_id=owner_id,
                         prompt="Parse this document and extract the resume information according to the provided schema."
                     )
-                # success
+                breaker.record_success()
+                # success; db_doc_id is filled in when the batch is flushed
                 return {
                     "filename": original_filename,
                     "success": True,
                     "attempts": attempt,
-                    "candidate_phone": result.get("candidate_phone"),
-                    "db_doc_id": str(result.get("db_doc").get("_id")) if result.get("db_doc") and result.get("db_doc").get("_id") else None,
-                }
+                    "candidate_phone": getattr(resume_model, "phone", None),
+                    "db_doc_id": None,
+                }, resume_model
             except Exception as exc:
                 last_error = exc
-                # detect transient vs permanent via message heuristics
-                msg = str(exc).lower()
-                is_transient = any(token in msg for token in ("503", "model is overloaded", "unavailable", "timeout"))
+                # detect transient vs permanent by exception type
+                is_transient = is_transient_error(exc)
+                if is_transient:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
 
                 logger.warning("File %s attempt %d/%d failed (transient=%s): %s",
                                original_filename, attempt, retry_attempts, is_transient, exc)
@@ -157,12 +306,11 @@ async def upload_resumes_bulk(
                         "success": False,
                         "attempts": attempt,
                         "error": str(last_error),
-                    }
+                    }, None
 
-                # backoff before next attempt (exponential + jitter)
-                backoff = min(2 ** (attempt - 1), 8)
-                jitter = random.uniform(0, backoff * 0.25)
-                sleep_for = backoff + jitter
+                # backoff before next attempt (decorrelated jitter, so concurrent files don't retry in lockstep)
+                sleep_for = min(RETRY_MAX_DELAY, random.uniform(RETRY_BASE_DELAY, prev_sleep * 3))
+                prev_sleep = sleep_for
                 logger.info("Sleeping %.2fs before retrying file %s (attempt %d)", sleep_for, original_filename, attempt + 1)
                 await asyncio.sleep(sleep_for)
 
@@ -172,40 +320,94 @@ async def upload_resumes_bulk(
             "success": False,
             "attempts": retry_attempts,
             "error": str(last_error) if last_error else "Unknown error",
-        }
+        }, None
 
-    # prepare all files: save to disk
-    save_tasks = []
-    for upload in files:
-        save_tasks.append(_save_upload_to_temp(upload))
+    async def _flush(batch: List[Tuple[int, Any]]):
+        """
+        Persist a batch of (result index, parsed resume) with one bulk write.
+        Items the server rejects fail individually; a transient failure of the whole batch
+        (network / failover) is retried with backoff (upserts are idempotent).
+        """
+        prev_sleep = RETRY_BASE_DELAY
+        for attempt in range(1, retry_attempts + 1):
+            try:
+                saved_docs, failed = await processor.upsert_many_to_db(
+                    owner_id=owner_id, parsed_resumes=[m for _, m in batch]
+                )
+                break
+            except Exception as exc:
+                transient = is_transient_error(exc)
+                logger.warning("Bulk DB write of %d resumes failed (attempt %d/%d, transient=%s): %s",
+                               len(batch), attempt, retry_attempts, transient, exc)
+                if not transient or attempt >= retry_attempts:
+                    for idx, _ in batch:
+                        results[idx].update(success=False, error=f"Database write failed: {exc}")
+                    return
+                sleep_for = min(RETRY_MAX_DELAY, random.uniform(RETRY_BASE_DELAY, prev_sleep * 3))
+                prev_sleep = sleep_for
+                await asyncio.sleep(sleep_for)
+
+        for pos, ((idx, _), doc) in enumerate(zip(batch, saved_docs)):
+            if pos in failed:
+                results[idx].update(success=False, error=f"Database write failed: {failed[pos]}")
+            else:
+                results[idx]["db_doc_id"] = str(doc["_id"]) if doc and doc.get("_id") else None
+
+    # pipeline: a producer saves files to disk while `concurrency` consumers process
+    # already-saved ones, so disk I/O of later files overlaps model calls of earlier ones
+    results: List[Optional[Dict[str, Any]]] = [None] * len(files)
+    pending: List[Tuple[int, Any]] = []
+    queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+    worker_count = min(concurrency, len(files))
+
+    async def _producer():
+        for idx, upload in enumerate(files):
+            error = _upload_error(upload)
+            if error is not None:
+                # rejected up front: never saved, never sent to the model
+                results[idx] = {"filename": upload.filename, "success": False, "attempts": 0, "error": error.detail}
+                continue
+            path = await _save_upload_to_temp(upload)
+            await queue.put((idx, path, upload.filename))
+        # one sentinel per consumer so every worker exits
+        for _ in range(worker_count):
+            await queue.put(None)
+
+    async def _consumer():
+        while (item := await queue.get()) is not None:
+            idx, path, original_filename = item
+            results[idx], parsed = await _process_with_attempts(local_path=path, original_filename=original_filename)
+            if parsed is not None:
+                pending.append((idx, parsed))
+                if len(pending) >= BULK_WRITE_BATCH_SIZE:
+                    batch = pending[:]
+                    pending.clear()
+                    await _flush(batch)
 
     try:
-        saved_paths = await asyncio.gather(*save_tasks)
+        async with asyncio.TaskGroup() as tg:
+            tg.create_task(_producer())
+            for _ in range(worker_count):
+                tg.create_task(_consumer())
     except Exception as e:
-        # cleanup and fail fast
+        # only the producer can fail (processing errors are captured per file); cleanup and fail fast
         shutil.rmtree(tmp_dir, ignore_errors=True)
-        logger.exception("Failed saving uploaded files: %s", e)
-        raise HTTPException(status_code=500, detail=f"Failed saving uploaded files: {e}")
+        cause = e.exceptions[0] if isinstance(e, ExceptionGroup) else e
+        logger.exception("Failed saving uploaded files: %s", cause)
+        raise HTTPException(status_code=500, detail=f"Failed saving uploaded files: {cause}")
 
-    # spawn processing coroutines for each saved file
-    processing_coros = []
-    for upload, path in zip(files, saved_paths):
-        processing_coros.append(_process_with_attempts(local_path=path, original_filename=upload.filename))
+    # persist whatever is left over from the last partial batch
+    if pending:
+        await _flush(pending)
 
-    # Run them concurrently (bounded by semaphore)
-    results = await asyncio.gather(*processing_coros)
-
-    # cleanup temp dir
-    try:
-        shutil.rmtree(tmp_dir)
-    except Exception:
-        logger.warning("Failed to remove temp dir %s", tmp_dir)
+    # cleanup temp dir after the response has been sent (runs in the threadpool)
+    background_tasks.add_task(_remove_dir, tmp_dir)
 
     # build summary
     success_count = sum(1 for r in results if r.get("success"))
     failure_count = len(results) - success_count
 
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=200,
         content={
             "status": "ok",
@@ -1,22 +1,22 @@
 import logging
-from fastapi import APIRouter, HTTPException, Depends, Request
-from sentence_transformers import SentenceTransformer
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Request
 from app.core.configs import config
 from app.schemas import RankRequest, RankResponse
-from app.services import ranking_service
+from app.services.ranking_service import ResumeRanker
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-def get_model(request: Request) -> SentenceTransformer:
-    """Dependency to get the loaded model from app state."""
-    return request.app.state.model
+def get_resume_ranker(request: Request) -> ResumeRanker:
+    """Dependency to get the ResumeRanker (wrapping the embedding model loaded at startup) from app state."""
+    ranker: Optional[ResumeRanker] = getattr(request.app.state, "resume_ranker", None)
+    if ranker is None:
+        raise HTTPException(status_code=503, detail="Embedding model not loaded")
+    return ranker
 
 @router.post("/rank", response_model=RankResponse)
-def rank_resumes(
-    req: RankRequest,
-    model: SentenceTransformer = Depends(get_model)
-):
+def rank_resumes(req: RankRequest, ranker: ResumeRanker = Depends(get_resume_ranker)):
     """
     Ranks a list of resumes against a job description.
 
@@ -37,22 +37,17 @@ def rank_resumes(
         )
 
     try:
-        ranked_results = ranking_service.rank_resumes_by_similarity(
-            model=model,
+        ranked_results = ranker.rank_resumes_by_similarity(
             job_description=req.job_description,
             resumes=req.resumes,
-            batch_size=config.EMBED_BATCH_SIZE
+            top_k=req.top_k,
         )
     except Exception as e:
         logger.exception("Failed during embedding or similarity calculation.")
         raise HTTPException(status_code=500, detail=f"Internal server error: {e}")
 
-    # Apply top_k filter if provided
-    top_k = req.top_k if req.top_k is not None else n
-    results_to_return = ranked_results[:top_k]
-
     return RankResponse(
         total_resumes=n,
-        returned=len(results_to_return),
-        results=results_to_return
+        returned=len(ranked_results),
+        results=ranked_results
     )
@@ -1,7 +1,7 @@
 from datetime import datetime, timezone
 import logging
 import uuid
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from app import schemas
 from app.schemas.utils_schemas import ScheduleResponse
 from app.services.Interview_manager import InterviewManager
@@ -9,10 +9,8 @@ from app.services.dispatch_service import create_token_with_agent_dispatch
 from app.helpers import prompt_builder
 from app.services.agent_registry import agent_registry
 from app.core.entrypoint_function import entrypoint
-from app.services.mongoDB_service import MongoService
 logger = logging.getLogger(__name__)
 router = APIRouter()
-mongo = MongoService(db_name="algojobs")
 
 # @router.post("/schedule", response_model=schemas.ScheduleResponse)
 # async def schedule_interview(req: schemas.ScheduleRequest):
@@ -64,11 +62,15 @@ mongo = MongoService(db_name="algojobs")
 #         logger.exception(f"Error scheduling interview for candidate {req.candidate_id}")
 #         raise HTTPException(status_code=500, detail=f"Failed to schedule interview: {e}")
 
-# instantiate manager and route
-interview_manager = InterviewManager(mongo_service=mongo)
+def get_interview_manager(request: Request) -> InterviewManager:
+    """Dependency to get the InterviewManager (backed by the shared MongoService) from app state."""
+    return request.app.state.interview_manager
 
 @router.post("/start", response_model=ScheduleResponse)
-async def start_interview(candidate_key: str = Query(..., description="Candidate key (candidateKey) stored in interview_keys")):
+async def start_interview(
+    candidate_key: str = Query(..., description="Candidate key (candidateKey) stored in interview_keys"),
+    interview_manager: InterviewManager = Depends(get_interview_manager),
+):
     """
     Start AI interview by candidate_key (query param). Only starts if interviewTime is now or earlier.
     """
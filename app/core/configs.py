@@ -1,34 +1,59 @@
-import os
+from functools import lru_cache
+from typing import Optional
 from dotenv import load_dotenv
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
-load_dotenv()
-
-class Settings():
+class Settings(BaseSettings):
     """
-    Application configuration settings loaded from environment variables.
+    Application configuration settings loaded from environment variables (and .env).
     """
+    model_config = SettingsConfigDict(env_file=".env", case_sensitive=True, extra="ignore")
+
     # --- General App Settings ---
     API_V1_STR: str = "/api/v1"
-    
+
     # --- Resume Ranker Settings ---
-    EMBEDDING_MODEL: str = os.getenv("EMBEDDING_MODEL", "Qwen/Qwen3-Embedding-0.6B")
-    EMBED_BATCH_SIZE: int = int(os.getenv("EMBED_BATCH_SIZE", "32"))
-    MAX_RESUMES: int = int(os.getenv("MAX_RESUMES", "1000"))
+    EMBEDDING_MODEL: str = "Qwen/Qwen3-Embedding-0.6B"
+    # "torch" or "onnx" (ONNX Runtime; needs sentence-transformers[onnx])
+    EMBEDDING_BACKEND: str = "torch"
+    # optional ONNX file inside the model repo, e.g. an int8 export "onnx/model_qint8_avx512_vnni.onnx"
+    EMBEDDING_ONNX_FILE: Optional[str] = None
+    # unset -> derived from the device / torch thread count at startup
+    EMBED_BATCH_SIZE: Optional[int] = None
+    MAX_RESUMES: int = 1000
+    # Atlas Vector Search index over stored resume embeddings; unset -> periodic ranking scores in Python
+    RESUME_VECTOR_INDEX: Optional[str] = None
+    RESUME_EMBEDDING_FIELD: str = "embedding"
+
+    # --- Resume Parser Settings ---
+    MAX_UPLOAD_BYTES: int = 10 * 1024 * 1024
+    MAX_BULK_RESUMES: int = 200
+    # process-wide cap on in-flight GenAI parses across all requests
+    GLOBAL_GENAI_CONC: int = 8
+    # per-api_key GenAI clients / circuit breakers kept in memory: at most this many, each for at most TTL seconds
+    GENAI_CLIENT_CACHE_SIZE: int = 32
+    GENAI_CLIENT_CACHE_TTL: int = 3600
 
     # --- Meeting Scheduler & LiveKit Agent Settings ---
-    LIVEKIT_API_KEY: str = os.getenv("LIVEKIT_API_KEY", "")
-    LIVEKIT_API_SECRET: str = os.getenv("LIVEKIT_API_SECRET", "")
-    LIVEKIT_URL: str = os.getenv("LIVEKIT_URL", "")
-    MEET_HOST: str = os.getenv("MEET_HOST", "https://meet.livekit.io")
-    TINYURL_API_KEY: str = os.getenv("TINYURL_API_KEY", "")
-    MONGO_DB_URL: str = os.getenv("MONGO_DB_URL", "mongodb://localhost:27017")
-    SHARED_SECRET: str = os.getenv("SHARED_SECRET", "default_shared_secret")
-    
-    class Config:
-        case_sensitive = True
-
-    if not all([LIVEKIT_API_KEY, LIVEKIT_API_SECRET, LIVEKIT_URL, MONGO_DB_URL, SHARED_SECRET]):
+    LIVEKIT_API_KEY: str = ""
+    LIVEKIT_API_SECRET: str = ""
+    LIVEKIT_URL: str = ""
+    MEET_HOST: str = "https://meet.livekit.io"
+    TINYURL_API_KEY: str = ""
+    MONGO_DB_URL: str = "mongodb://localhost:27017"
+    SHARED_SECRET: str = "default_shared_secret"
+
+
+@lru_cache()
+def get_settings() -> Settings:
+    """Build, validate and cache the settings; env parsing happens once per process."""
+    # still export .env into os.environ for libraries that read it directly (LiveKit, OpenAI, ...)
+    load_dotenv()
+    settings = Settings()
+    if not all([settings.LIVEKIT_API_KEY, settings.LIVEKIT_API_SECRET, settings.LIVEKIT_URL,
+                settings.MONGO_DB_URL, settings.SHARED_SECRET]):
         raise Exception("Environment variables not set properly. Please check your .env file.")
+    return settings
 
 # Instantiate settings
-config = Settings()
+config = get_settings()
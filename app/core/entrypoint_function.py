@@ -1,26 +1,63 @@
 
 from app.core.single_agent import SingleAgent
 from app.helpers.agent_builder import build_llm_instance, build_stt_instance, build_tts_instance
-from app.schemas import AgentConfig ,Agent
+from app.schemas import Agent
 from datetime import datetime
-import json
 import os
+import aiofiles
+import orjson
+from typing import Any, Dict, Optional
+from cachetools import TTLCache
 from livekit import agents 
+from livekit.plugins import silero
 from livekit.agents.voice import AgentSession
 from app.services.mongoDB_service import MongoService
 
-mongo = MongoService(db_name="algojobs")
+
+def _get_mongo(proc: agents.JobProcess) -> MongoService:
+    """Return the job process' MongoService, creating it once per process."""
+    mongo = proc.userdata.get("mongo")
+    if mongo is None:
+        mongo = proc.userdata["mongo"] = MongoService(db_name="algojobs")
+    return mongo
+
+# transcripts are written here (relative to project root); created once per job process in prewarm
+TRANSCRIPTS_DIR = "transcriptions"
+
+# agent configs change rarely and many jobs share an agent_id; entries go stale after `ttl` seconds
+_agent_config_cache: TTLCache = TTLCache(maxsize=512, ttl=300)
+
+def get_cached_agent_config(mongo: MongoService, agent_id: str) -> Optional[Dict[str, Any]]:
+    """Agent document for `agent_id`, served from the per-process TTL cache when possible."""
+    agent_doc = _agent_config_cache.get(agent_id)
+    if agent_doc is None:
+        agent_doc = mongo.get_agent_config_by_id(agent_id)
+        if agent_doc is not None:
+            _agent_config_cache[agent_id] = agent_doc
+    return agent_doc
+
+def prewarm(proc: agents.JobProcess):
+    """
+    Worker prewarm hook, run once per job process before any job is assigned:
+    loads the Silero VAD weights (shared by every job the process runs), opens the Mongo pool
+    and creates the transcripts directory.
+    """
+    proc.userdata["vad"] = silero.VAD.load()
+    _get_mongo(proc)
+    os.makedirs(TRANSCRIPTS_DIR, exist_ok=True)
 
 async def entrypoint(ctx: agents.JobContext):
 
-    metadata = json.loads(ctx.job.metadata)
+    metadata = orjson.loads(ctx.job.metadata)
     prompt = metadata.get("prompt", "You are an AI assistant helping with interviews.")
     agent_id = metadata.get("agent_id", "unknown_agent")
 
-    agent_doc= mongo.get_agent_config_by_id(agent_id)
-    agent_doc = Agent.model_validate(agent_doc)
-    agent_config = getattr(agent_doc, "agentConfig", None)
-    agent_config = AgentConfig.model_validate(agent_config).model_dump()
+    mongo = _get_mongo(ctx.proc)
+    agent_doc = get_cached_agent_config(mongo, agent_id)
+    # a single validation pass: Agent already validates the nested agentConfig into an AgentConfig model
+    agent_config = Agent.model_validate(agent_doc).agentConfig
+    if agent_config is None:
+        raise ValueError(f"Agent {agent_id} has no agentConfig")
 
     llm = build_llm_instance(agent_config.llm.provider, agent_config.llm.model, agent_config.llm.api_key, agent_config.llm.temperature)
     stt = build_stt_instance(agent_config.stt.provider, agent_config.stt.model, agent_config.stt.language, agent_config.stt.api_key)
@@ -29,15 +66,11 @@ async def entrypoint(ctx: agents.JobContext):
 
     async def write_transcript():
         current_date = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = os.path.join(TRANSCRIPTS_DIR, f"transcript_{ctx.room.name}_{current_date}.json")
 
-        # Ensure directory exists
-        save_dir = "transcriptions"   # relative to project root
-        os.makedirs(save_dir, exist_ok=True)
-
-        filename = os.path.join(save_dir, f"transcript_{ctx.room.name}_{current_date}.json")
-
-        with open(filename, 'w') as f:
-            json.dump(session.history.to_dict(), f, indent=2)
+        # compact JSON (orjson emits bytes directly) written through aiofiles so the disk write doesn't block the event loop
+        async with aiofiles.open(filename, 'wb') as f:
+            await f.write(orjson.dumps(session.history.to_dict()))
 
         print(f"Transcript for {ctx.room.name} saved to {filename}")
         # result = evaluate_candidate(session.history.to_dict(),evaluation_template=evaluation_template,jd_text=jd,resume_text=resume ,save_dir="evaluations")
@@ -48,7 +81,7 @@ async def entrypoint(ctx: agents.JobContext):
     ctx.add_shutdown_callback(write_transcript)
     await ctx.connect()
 
-    session = AgentSession(stt=stt, llm=llm, tts=tts, vad=ctx.proc.userdata["vad"])
+    session = AgentSession(stt=stt, llm=llm, tts=tts, vad=ctx.proc.userdata.get("vad") or silero.VAD.load())
 
     agent = SingleAgent(prompt=prompt)
 
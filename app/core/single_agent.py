@@ -31,9 +31,12 @@ class SingleAgent(Agent):
         tools: list[FunctionTool],
         model_settings: ModelSettings
     ) -> AsyncIterable[llm.ChatChunk]:
+        # local alias: one fast local load per streamed token instead of a global lookup
+        _preprocess = preprocess_text
         async for chunk in Agent.default.llm_node(self, chat_ctx, tools, model_settings):
-            if chunk.delta and chunk.delta.content:
-               chunk.delta.content = preprocess_text(chunk.delta.content)
+            delta = chunk.delta
+            if delta is not None and (content := delta.content):
+                delta.content = _preprocess(content)
             yield chunk
 
     @function_tool()
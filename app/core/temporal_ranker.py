@@ -1,9 +1,11 @@
 import asyncio
 import logging
-import contextlib
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
 from typing import Optional, Any, Dict, List
 
+from pydantic import TypeAdapter, ValidationError
 from app.services.mongoDB_service import MongoService
 from app.services.multi_job import MultiJobRankingService
 from app.services.ranking_service import ResumeRanker
@@ -12,18 +14,32 @@ from app.schemas import Job
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
+IST = ZoneInfo("Asia/Kolkata")
+
+# one dedicated worker for ranking passes: runs never overlap (run_now vs. the loop) and a long
+# pass doesn't occupy the default executor that asyncio.to_thread calls elsewhere rely on
+_ranking_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="periodic_ranker")
+
+# validates all jobs in one pydantic-core call; per-item validation only runs when that fails
+_jobs_adapter = TypeAdapter(List[Job])
+
 
 class PeriodicResumeRanker:
     """
     Lightweight periodic runner that mirrors your __main__ test but runs continuously.
 
-    Initialization parameters (only these three are accepted):
+    Initialization parameters:
       - interval_seconds: how often to run (default 3 hours)
       - start_hour_ist: inclusive start hour in IST for allowed runs
       - end_hour_ist: exclusive end hour in IST for allowed runs
+      - mongo: shared MongoService (e.g. app.state.mongo_service); if omitted one is
+        created on the first run, kept for the ranker's lifetime and closed by stop()
+      - ranker: shared ResumeRanker; if omitted one is created on the first run and reused.
+        Runs are serialized on a single executor thread, so the ranker is never used by two runs
+        at once (encode() may still run concurrently with other users of a shared model).
 
     Behavior:
-      - Uses MongoService(db_name="algojobs") to fetch jobs and to create MultiJobRankingService.
+      - Uses the MongoService to fetch jobs and to create MultiJobRankingService.
       - Validates jobs using the single Job schema; uses raw dict fallback if validation fails.
       - Each run executes the same logic as your __main__ snippet.
     """
@@ -34,11 +50,19 @@ class PeriodicResumeRanker:
         interval_seconds: int = 3 * 60 * 60,
         start_hour_ist: int = 6,
         end_hour_ist: int = 18,
+        mongo: Optional[MongoService] = None,
+        ranker: Optional[ResumeRanker] = None,
     ):
         self.interval_seconds = int(interval_seconds)
         self.start_hour_ist = int(start_hour_ist)
         self.end_hour_ist = int(end_hour_ist)
 
+        # reused across runs so the driver's connection pool survives between iterations
+        self._mongo = mongo
+        self._owns_mongo = mongo is None
+        # embedding model weights are loaded once, not on every run
+        self._ranker = ranker
+
         # control fields for background task
         self._task: Optional[asyncio.Task] = None
         self._stopping = asyncio.Event()
@@ -50,9 +74,7 @@ class PeriodicResumeRanker:
 
     def _in_active_window(self) -> bool:
         """Return True if current IST hour is within configured active window."""
-        now_utc = datetime.utcnow()
-        ist_now = now_utc + timedelta(hours=5, minutes=30)
-        return self.start_hour_ist <= ist_now.hour < self.end_hour_ist
+        return self.start_hour_ist <= datetime.now(IST).hour < self.end_hour_ist
 
     def _run_once(self) -> None:
         """
@@ -60,24 +82,27 @@ class PeriodicResumeRanker:
         Mirrors your original __main__ logic.
         """
         logger.info("PeriodicJobRanker: starting run_once")
-        mongo = None
         try:
-            ranker = ResumeRanker()
-            mongo = MongoService(db_name="algojobs")
+            if self._ranker is None:
+                self._ranker = ResumeRanker()
+            ranker = self._ranker
+            if self._mongo is None:
+                self._mongo = MongoService(db_name="algojobs")
+            mongo = self._mongo
 
             raw_jobs = mongo.get_all_jobs(limit=0) or []
             logger.info("Fetched %d jobs from Mongo", len(raw_jobs))
 
             jobs_validated: List[object] = []
-            for j in raw_jobs:
-                try:
-                    if hasattr(Job, "model_validate"):
+            try:
+                jobs_validated = _jobs_adapter.validate_python(raw_jobs)
+            except ValidationError:
+                for j in raw_jobs:
+                    try:
                         jobs_validated.append(Job.model_validate(j))
-                    else:
-                        jobs_validated.append(Job.parse_obj(j))
-                except Exception:
-                    logger.exception("Job validation failed - using raw dict fallback for job=%r", j)
-                    jobs_validated.append(j)
+                    except Exception:
+                        logger.exception("Job validation failed - using raw dict fallback for job=%r", j)
+                        jobs_validated.append(j)
 
             if not jobs_validated:
                 logger.warning("No jobs found; skipping run")
@@ -87,34 +112,31 @@ class PeriodicResumeRanker:
             summary = svc.rank_all_jobs_and_upsert(jobs_validated)
             logger.info("run_once completed: %s", summary)
 
-            self.last_run = datetime.utcnow()
+            self.last_run = datetime.now(timezone.utc)
             self.last_summary = summary
 
         except Exception:
             logger.exception("Error during run_once")
         finally:
-            # ensure mongo closed (MultiJobRankingService used the same mongo instance)
-            if mongo:
-                try:
-                    mongo.close()
-                except Exception:
-                    logger.exception("Error closing MongoService after run_once")
             logger.info("PeriodicJobRanker: run_once finished")
 
     async def run_now(self) -> None:
         """Async helper to run the job immediately (runs blocking work in a threadpool)."""
-        await asyncio.to_thread(self._run_once)
+        await asyncio.get_running_loop().run_in_executor(_ranking_executor, self._run_once)
 
     async def _loop(self) -> None:
         """Background loop that runs until stop() is called."""
         logger.info("PeriodicJobRanker: background loop started")
+        loop = asyncio.get_running_loop()
         try:
             while not self._stopping.is_set():
+                # next wakeup on the monotonic clock, so run time and wall-clock jumps don't shift the cadence
+                next_wake = loop.time() + self.interval_seconds
                 try:
                     if self._in_active_window():
                         logger.debug("Within active IST window; scheduling run_once")
                         try:
-                            await asyncio.to_thread(self._run_once)
+                            await loop.run_in_executor(_ranking_executor, self._run_once)
                         except asyncio.CancelledError:
                             logger.info("PeriodicJobRanker: run cancelled")
                             raise
@@ -123,31 +145,20 @@ class PeriodicResumeRanker:
                     else:
                         logger.debug("Outside active IST window; skipping run")
 
-                    # Wait for wakeup or stop or timeout
-                    wait_tasks = {
-                        asyncio.create_task(self._stopping.wait()),
-                        asyncio.create_task(self._wakeup.wait()),
-                    }
+                    # Wait for wakeup (stop() sets it too) or timeout; no helper tasks to create or cancel
                     try:
-                        done, pending = await asyncio.wait(wait_tasks, timeout=self.interval_seconds, return_when=asyncio.FIRST_COMPLETED)
+                        await asyncio.wait_for(self._wakeup.wait(), timeout=max(0.0, next_wake - loop.time()))
+                    except asyncio.TimeoutError:
+                        pass
                     except asyncio.CancelledError:
                         logger.info("PeriodicJobRanker: loop cancelled during wait")
                         raise
-
-                    # clear wakeup if it fired
-                    if self._wakeup.is_set():
-                        self._wakeup.clear()
+                    self._wakeup.clear()
 
                     # if stopping, break out
                     if self._stopping.is_set():
                         break
 
-                    # cancel any pending tasks to avoid leaks
-                    for t in pending:
-                        t.cancel()
-                        with contextlib.suppress(asyncio.CancelledError):
-                            await t
-
                 except asyncio.CancelledError:
                     logger.info("PeriodicJobRanker: background loop cancelled")
                     raise
@@ -187,6 +198,13 @@ class PeriodicResumeRanker:
             logger.info("PeriodicJobRanker stop() cancelled during shutdown")
         finally:
             self._task = None
+            # only close a client this ranker created; a shared one belongs to the app
+            if self._owns_mongo and self._mongo is not None:
+                try:
+                    self._mongo.close()
+                except Exception:
+                    logger.exception("Error closing MongoService")
+                self._mongo = None
 
     def is_running(self) -> bool:
         """Return True if background task is active."""
@@ -195,6 +213,6 @@ class PeriodicResumeRanker:
 
 # Example usage (run manually):
 # if __name__ == "__main__":
-#     pr = PeriodicJobRanker()
+#     pr = PeriodicResumeRanker()
 #     pr.start()
 #     # ... later await pr.stop()
@@ -2,8 +2,14 @@ from livekit.plugins import openai, google, deepgram, groq, sarvam, speechify
 from typing import Optional
 from app.helpers.decripter import decrypt_api_key
 
+def _maybe_decrypt(value):
+    """Decrypt an encrypted key string; values that are already decrypted (e.g. credential dicts) pass through."""
+    if value == "":
+        raise ValueError("Encrypted API key is empty")
+    return decrypt_api_key(value) if isinstance(value, str) else value
+
 def build_llm_instance(provider: str, model: str, encrypted_api_key: str, temperature: Optional[float]=None):
-    api_key=decrypt_api_key(encrypted_api_key)
+    api_key=_maybe_decrypt(encrypted_api_key)
     if provider == "google":
         return google.LLM(model=model, api_key=api_key,temperature=temperature)
     elif provider == "groq":
@@ -13,7 +19,7 @@ def build_llm_instance(provider: str, model: str, encrypted_api_key: str, temper
     return openai.LLM(model=model, api_key=api_key,temperature=temperature)
 
 def build_stt_instance(provider: str, model: str, language: str, encrypted_api_key: str):
-    api_key=decrypt_api_key(encrypted_api_key)
+    api_key=_maybe_decrypt(encrypted_api_key)
     if provider == "openai":
         return openai.STT(model=model, language=language, api_key=api_key)
     elif provider == "deepgram":
@@ -31,7 +37,7 @@ def build_tts_instance(
         instructions :Optional[str] =None,
         credentials_info: dict | str = None
         ):
-    api_key=decrypt_api_key(credentials_info)
+    api_key=_maybe_decrypt(credentials_info)
     if provider == "google":
         tts_kwargs = {
             "voice_name": model,
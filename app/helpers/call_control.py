@@ -1,27 +1,47 @@
 from livekit.agents import function_tool, RunContext, get_job_context
 from livekit.api import DeleteRoomRequest
 from aiohttp.client_exceptions import ClientConnectionError
+import asyncio
 import logging
 import aiohttp
 from aiohttp.client_exceptions import ClientOSError
 import ssl
+from collections import OrderedDict
 from typing import Optional
 from livekit.api.twirp_client import TwirpError
 
 logger = logging.getLogger("call_control")
 
+# rooms this worker process already deleted (bounded, oldest evicted first); a repeated hangup
+# returns early instead of issuing another delete_room and handling the resulting error
+_DELETED_ROOMS_MAX = 256
+_deleted_rooms: "OrderedDict[str, None]" = OrderedDict()
+
+def _mark_deleted(room_name: str) -> None:
+    _deleted_rooms[room_name] = None
+    _deleted_rooms.move_to_end(room_name)
+    if len(_deleted_rooms) > _DELETED_ROOMS_MAX:
+        _deleted_rooms.popitem(last=False)
+
 async def hangup(reason: Optional[str] = None):
     """Helper function to hang up the call by deleting the room"""
+    room_name = None
     try:
         job_ctx = get_job_context()
         room_name = job_ctx.room.name
+        if room_name in _deleted_rooms:
+            logger.debug(f"Room '{room_name}' already deleted; skipping delete_room.")
+            return
         logger.info(f"Attempting to delete room: {room_name}")
 
-        await job_ctx.api.room.delete_room(DeleteRoomRequest(room=room_name))
+        # shielded so a cancelled caller can't abort the RPC halfway through teardown
+        await asyncio.shield(job_ctx.api.room.delete_room(DeleteRoomRequest(room=room_name)))
+        _mark_deleted(room_name)
         logger.info(f"Room '{room_name}' deleted successfully.")
 
     except TwirpError as e:
         if e.code == "not_found":
+            _mark_deleted(room_name)
             logger.warning(f"Room '{room_name}' not found during deletion. May have already been deleted.")
         else:
             logger.error(f"Twirp error while deleting room: {e}")
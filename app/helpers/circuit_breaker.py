@@ -0,0 +1,71 @@
+import logging
+import time
+from typing import Optional
+
+logger = logging.getLogger("circuit_breaker")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Minimal circuit breaker for an upstream provider (single event loop, not thread-safe).
+
+    - CLOSED: calls flow; `failure_threshold` consecutive failures open the circuit.
+    - OPEN: calls are rejected until `reset_timeout` seconds have passed.
+    - HALF_OPEN: a single probe call is let through; success closes, failure re-opens.
+      A probe that never reports back is abandoned after `reset_timeout` seconds.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 3, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self.state = CLOSED
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probe_in_flight = False
+        self._probe_started: Optional[float] = None
+
+    def allow(self) -> bool:
+        """Return True if a call may be attempted now."""
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN:
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                return False
+            self.state = HALF_OPEN
+            self._probe_in_flight = False
+            logger.info("Circuit %s half-open; allowing a probe call", self.name)
+        # HALF_OPEN: only one probe at a time
+        now = time.monotonic()
+        if self._probe_in_flight and now - self._probe_started < self.reset_timeout:
+            return False
+        self._probe_in_flight = True
+        self._probe_started = now
+        return True
+
+    def release(self) -> None:
+        """Give back a probe slot handed out by allow() when no call was actually made."""
+        if self.state == HALF_OPEN:
+            self._probe_in_flight = False
+
+    def record_success(self) -> None:
+        if self.state != CLOSED:
+            logger.info("Circuit %s closed", self.name)
+        self.state = CLOSED
+        self._failures = 0
+        self._opened_at = None
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self.state == HALF_OPEN or self._failures >= self.failure_threshold:
+            if self.state != OPEN:
+                logger.warning("Circuit %s opened after %d consecutive failures", self.name, self._failures)
+            self.state = OPEN
+            self._opened_at = time.monotonic()
+            self._probe_in_flight = False
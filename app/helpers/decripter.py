@@ -1,6 +1,7 @@
-import base64
+import binascii
 import hashlib
 import json
+from functools import lru_cache
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 from app.core.configs import config
 
@@ -8,20 +9,25 @@ shared_secret = config.SHARED_SECRET
 
 encryption_key = hashlib.sha256(shared_secret.encode()).digest()
 
-def decrypt_api_key(encrypted_str):
+# AESGCM holds only the key and is safe to share, so build it once
+_aesgcm = AESGCM(encryption_key)
+
+@lru_cache(maxsize=256)
+def _decrypt(encrypted_str):
     iv_b64, auth_tag_b64, encrypted_b64 = encrypted_str.split('.')
-    iv = base64.b64decode(iv_b64)
-    auth_tag = base64.b64decode(auth_tag_b64)
-    encrypted = base64.b64decode(encrypted_b64)
+    iv = binascii.a2b_base64(iv_b64)
+    auth_tag = binascii.a2b_base64(auth_tag_b64)
+    encrypted = binascii.a2b_base64(encrypted_b64)
 
     # Ciphertext with auth tag appended (as required by AESGCM)
     ciphertext_with_tag = encrypted + auth_tag
 
-    aesgcm = AESGCM(encryption_key)
-    decrypted = aesgcm.decrypt(iv, ciphertext_with_tag, None)
+    return _aesgcm.decrypt(iv, ciphertext_with_tag, None).decode()
 
+def decrypt_api_key(encrypted_str):
+    # only the decrypted text is cached; JSON is parsed per call so callers never share a mutable dict
+    decrypted = _decrypt(encrypted_str)
     try:
-        return json.loads(decrypted.decode())
+        return json.loads(decrypted)
     except json.JSONDecodeError:
-        return decrypted.decode()
-
+        return decrypted
@@ -1,43 +1,78 @@
+import logging
 import re
+from functools import lru_cache
+from bson import ObjectId
 from app.schemas import Agent
 from pydantic import ValidationError
 
+logger = logging.getLogger(__name__)
 
-# Function to strip markdown from the content
-def preprocess_text(text: str) -> str:
-    if not text:
-        return ""
-    # Remove triple backticks (```), but keep inner content
-    text = re.sub(r'```+', '', text)
 
-    # Remove hyphens and dashes
-    text = re.sub(r'-', '', text)
+# markdown-stripping patterns, compiled once at import
+_RE_BACKTICKS = re.compile(r'```+')                      # triple backticks (```), inner content kept
+_DELETE_DASHES = str.maketrans('', '', '-')              # hyphens and dashes (plain deletion, no regex)
+_RE_HEADER = re.compile(r'(^|\n)\s*#{1,6}\s*')           # headers (e.g., ## Header)
+_RE_BOLD = re.compile(r'(\*\*|__)(.*?)\1')
+_RE_ITALIC = re.compile(r'(\*|_)(.*?)\1')
+_RE_STRIKE = re.compile(r'~~(.*?)~~')
+_RE_INLINE_CODE = re.compile(r'`([^`]+)`')
+_RE_LINK = re.compile(r'\[(.*?)\]\([^)]*\)')             # [text](link) -> text
+_RE_IMG = re.compile(r'!\[(.*?)\]\([^)]*\)')             # ![alt](image) -> alt
+# every pattern above needs at least one of these characters; text without them needs no pass
+_RE_MARKDOWN_CHARS = re.compile(r'[`\-#*_~\[]')
 
-    # Remove headers (e.g., ## Header)
-    text = re.sub(r'(^|\n)\s*#{1,6}\s*', r'\1', text)
 
-    # Remove bold and italic markers
-    text = re.sub(r'(\*\*|__)(.*?)\1', r'\2', text)  # Bold
-    text = re.sub(r'(\*|_)(.*?)\1', r'\2', text)     # Italic
-    text = re.sub(r'~~(.*?)~~', r'\1', text)         # Strikethrough
+# inputs longer than this bypass the result cache so it never pins large strings
+_PREPROCESS_CACHE_MAX_LEN = 4096
 
-    # Remove inline code markers
-    text = re.sub(r'`([^`]+)`', r'\1', text)
 
-    # Remove fenced code block markers but keep the code content
-    text = re.sub(r'```[\w]*\n([\s\S]*?)```', r'\1', text)
+# Function to strip markdown from the content
+# (called per streamed LLM token; short fragments repeat a lot, and the result is pure, so it is cached)
+def preprocess_text(text: str) -> str:
+    if text and len(text) > _PREPROCESS_CACHE_MAX_LEN:
+        return _strip_markdown(text)
+    return _strip_markdown_cached(text)
 
-    # Replace [text](link) with just text
-    text = re.sub(r'\[(.*?)\]\([^)]*\)', r'\1', text)
 
-    # Replace ![alt](image) with just alt text
-    text = re.sub(r'!\[(.*?)\]\([^)]*\)', r'\1', text)
+def _strip_markdown(text: str) -> str:
+    if not text:
+        return ""
+    # most streamed tokens are plain words: one C-level scan instead of nine passes
+    if _RE_MARKDOWN_CHARS.search(text) is None:
+        return text
+
+    # each pass below only runs if the character it needs is present
+    if '`' in text:
+        text = _RE_BACKTICKS.sub('', text)
+    if '-' in text:
+        text = text.translate(_DELETE_DASHES)
+    if '#' in text:
+        text = _RE_HEADER.sub(r'\1', text)
+
+    # Remove bold, italic and strikethrough markers
+    if '*' in text or '_' in text:
+        text = _RE_BOLD.sub(r'\2', text)
+        text = _RE_ITALIC.sub(r'\2', text)
+    if '~' in text:
+        text = _RE_STRIKE.sub(r'\1', text)
+
+    # Remove inline code markers. No separate fenced-block pass: any ``` left after
+    # _RE_BACKTICKS is split by this pass first, so a fence pattern could never match.
+    if '`' in text:
+        text = _RE_INLINE_CODE.sub(r'\1', text)
+
+    # Replace links and images with their text
+    if '[' in text:
+        text = _RE_LINK.sub(r'\1', text)
+        text = _RE_IMG.sub(r'\1', text)
 
     return text
 
 
+_strip_markdown_cached = lru_cache(maxsize=4096)(_strip_markdown)
+
+
 def safe_str(value):
-    from bson import ObjectId
     return str(value) if isinstance(value, ObjectId) else value
 
 def parse_agent_config(raw_json: dict) -> Agent:
@@ -74,6 +109,6 @@ def parse_agent_config(raw_json: dict) -> Agent:
 
         return agent_config
 
-    except ValidationError as e:
-        print("Validation error while parsing agent config:", e)
+    except ValidationError:
+        logger.exception("Validation error while parsing agent config")
         raise
@@ -2,13 +2,8 @@
 
 
 
-def create_interview_prompt(resume: str, job_description: str, interview_template: str) -> str:
-    """
-    Merges the candidate resume, job description, and interview template
-    into a single, comprehensive prompt for the AI interviewer agent.
-    """
-    
-    prompt = f"""
+# fixed prompt skeleton, parsed once at import; only the three sections vary per interview
+_INTERVIEW_PROMPT_TEMPLATE = """
 {interview_template}
 
 Here is the context for the interview you are about to conduct.
@@ -24,4 +19,15 @@ Here is the context for the interview you are about to conduct.
 
 Please begin the interview when you are ready. Greet the candidate by name and start with your first question.
 """
-    return prompt
+
+
+def create_interview_prompt(resume: str, job_description: str, interview_template: str) -> str:
+    """
+    Merges the candidate resume, job description, and interview template
+    into a single, comprehensive prompt for the AI interviewer agent.
+    """
+    return _INTERVIEW_PROMPT_TEMPLATE.format(
+        interview_template=interview_template,
+        job_description=job_description,
+        resume=resume,
+    )
@@ -1,7 +1,10 @@
 from __future__ import annotations
+import logging
 from datetime import datetime, date
-from typing import List, Optional, Any, Dict, Union
-from pydantic import BaseModel, Field, EmailStr, ValidationError
+from typing import List, Optional, Any, Dict
+from pydantic import BaseModel, Field, EmailStr, TypeAdapter, ValidationError, field_validator
+
+logger = logging.getLogger(__name__)
 
 
 # --- Nested models ---
@@ -102,6 +105,42 @@ class CompetitiveExam(BaseModel):
     year: Optional[int] = None
 
 
+# per-item validators for the lenient list fields below (built once at import)
+_SKILL_ADAPTER = TypeAdapter(Skill)
+_KEY_SKILL_ADAPTER = TypeAdapter(KeySkill)
+_EDUCATION_ADAPTER = TypeAdapter(Education)
+_ACHIEVEMENT_ADAPTER = TypeAdapter(AcademicAchievement)
+
+
+def _coerce_entries(v: Any, adapter: TypeAdapter, field: str, key: str) -> List[Any]:
+    """
+    Normalise legacy list shapes before validation: None -> [], a dict keyed by id -> its values,
+    a bare string (top-level or as an entry) -> {key: s}. Each entry is then validated against the
+    item model on its own; entries that fail are dropped (and counted in a warning) so one bad
+    entry does not reject the whole resume.
+    """
+    if not v:
+        return []
+    if isinstance(v, dict):
+        v = list(v.values())
+    elif isinstance(v, str):
+        v = [v]
+    elif not isinstance(v, (list, tuple)):
+        logger.warning("Resume.%s: dropped unsupported value of type %s", field, type(v).__name__)
+        return []
+    out: List[Any] = []
+    for item in v:
+        if isinstance(item, str):
+            item = {key: item} if item else None
+        try:
+            out.append(adapter.validate_python(item))
+        except ValidationError:
+            continue
+    if len(out) < len(v):
+        logger.warning("Resume.%s: dropped %d of %d entries that failed validation", field, len(v) - len(out), len(v))
+    return out
+
+
 # --- Main Resume model ---
 
 
@@ -138,10 +177,10 @@ class Resume(BaseModel):
     totalExperienceYears: Optional[float] = None
 
     # main lists (normalized)
-    skills: Union[List[Skill],Any] = Field(default_factory=list)
-    keySkills:Union[List[KeySkill],Any]  = Field(default_factory=list)
-    education: Union[List[Education],Any] = Field(default_factory=list)
-    academicAchievements: Union[List[AcademicAchievement],Any] = Field(default_factory=list)
+    skills: List[Skill] = Field(default_factory=list)
+    keySkills: List[KeySkill] = Field(default_factory=list)
+    education: List[Education] = Field(default_factory=list)
+    academicAchievements: List[AcademicAchievement] = Field(default_factory=list)
     experiences: List[Experience] = Field(default_factory=list)
     internships: List[Internship] = Field(default_factory=list)
     languages: List[LanguageProficiency] = Field(default_factory=list)
@@ -161,6 +200,27 @@ class Resume(BaseModel):
     tags: List[str] = Field(default_factory=list)
     extras: Optional[Dict[str, Any]] = Field(default_factory=dict)
 
+    # coerce legacy shapes once here so the fields above stay plain lists (no Union fallback to Any)
+    @field_validator("skills", mode="before")
+    @classmethod
+    def _coerce_skills(cls, v: Any) -> List[Any]:
+        return _coerce_entries(v, _SKILL_ADAPTER, "skills", "name")
+
+    @field_validator("keySkills", mode="before")
+    @classmethod
+    def _coerce_key_skills(cls, v: Any) -> List[Any]:
+        return _coerce_entries(v, _KEY_SKILL_ADAPTER, "keySkills", "name")
+
+    @field_validator("academicAchievements", mode="before")
+    @classmethod
+    def _coerce_achievements(cls, v: Any) -> List[Any]:
+        return _coerce_entries(v, _ACHIEVEMENT_ADAPTER, "academicAchievements", "title")
+
+    @field_validator("education", mode="before")
+    @classmethod
+    def _coerce_education(cls, v: Any) -> List[Any]:
+        return _coerce_entries(v, _EDUCATION_ADAPTER, "education", "details")
+
     # class Config:
     #     allow_population_by_field_name = True
     #     arbitrary_types_allowed = True
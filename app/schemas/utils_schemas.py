@@ -25,6 +25,7 @@ class RankRequest(BaseModel):
 class RankResponse(BaseModel):
     total_resumes: int
     returned: int
+    results: List[RankedResumeOut]
     
 # --- Scheduler API Schemas ---
 
@@ -1,25 +1,46 @@
+import asyncio
 from fastapi import APIRouter, HTTPException, Query
 from datetime import datetime, timezone
-import uuid
+from bson import ObjectId
+try:
+    from dateutil.parser import isoparse as _isoparse  # optional
+except ImportError:
+    _isoparse = None
+import secrets
 import logging
 from typing import Optional, Dict, Any
-from app.schemas import Job, JobDescription ,Resume
-from app.services.mongoDB_service import MongoService
+from app.schemas import Job, Resume
+from app.services.mongoDB_service import MongoService, INTERVIEW_CANDIDATE_FIELDS, INTERVIEW_JOB_FIELDS
 from app.services.dispatch_service import create_token_with_agent_dispatch
 from app.helpers import prompt_builder
 from app.services.agent_registry import agent_registry
-from app.core.entrypoint_function import entrypoint
+from app.core.entrypoint_function import entrypoint, prewarm
 from app.schemas import ScheduleResponse
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+_PRIMITIVE_TYPES = frozenset({str, int, float, bool, type(None)})
+
+# interview / evaluation template pairs picked by InterviewManager._pick_templates
+_DEFAULT_TEMPLATES = {"interview_template": "general", "evaluation_template": "standard_evaluation_v1"}
+_SENIOR_TEMPLATES = {"interview_template": "senior", "evaluation_template": "senior_evaluation_v1"}
+
+
+def _first(doc: Dict[str, Any], keys) -> Any:
+    """First truthy value among `keys` in `doc` (None if none)."""
+    for k in keys:
+        v = doc.get(k)
+        if v:
+            return v
+    return None
+
 class InterviewManager:
     """
     Combined flow:
       1) lookup interview_keys by candidateKey
       2) ensure interviewTime <= now (or missing -> proceed)
-      3) fetch resume and job using MongoService helpers and normalize to strings
+      3) take the resume and job joined into that lookup and normalize to strings
       4) pick predefined interview + evaluation templates (simple heuristic)
       5) build prompt via prompt_builder.create_interview_prompt
       6) create token passing agent_id from interview_keys, and start agent via registry
@@ -29,10 +50,9 @@ class InterviewManager:
         self.mongo = mongo_service
 
     def _find_interview_by_candidate_key(self, candidate_key: str) -> Optional[Dict[str, Any]]:
-        coll = self.mongo._get_collection("interview_keys")
+        """interview_keys entry with the referenced resume ("resume") and job ("jobDoc") joined in."""
         try:
-            doc = coll.find_one({"candidateKey": candidate_key})
-            return doc
+            return self.mongo.get_interview_bundle(candidate_key)
         except Exception as e:
             logger.exception("Error querying interview_keys for candidateKey=%s : %s", candidate_key, e)
             raise HTTPException(status_code=500, detail="Database error when searching interview_keys")
@@ -44,9 +64,8 @@ class InterviewManager:
         """
         if interview_time_raw is None:
             return None
-        from datetime import datetime as _dt
         try:
-            if isinstance(interview_time_raw, _dt):
+            if isinstance(interview_time_raw, datetime):
                 dt = interview_time_raw
                 if dt.tzinfo is None:
                     dt = dt.replace(tzinfo=timezone.utc)
@@ -54,13 +73,13 @@ class InterviewManager:
                     dt = dt.astimezone(timezone.utc)
                 return dt
             if isinstance(interview_time_raw, str):
-                # try ISO parsing; use fromisoformat as fallback
+                # stdlib first (3.11+ accepts "Z" and most ISO 8601 forms); dateutil only for what it rejects
                 try:
-                    # Python 3.11+ has fromisoformat improved; we use it as fallback if dateutil not present
-                    from dateutil import parser as _parser  # optional
-                    dt = _parser.isoparse(interview_time_raw)
-                except Exception:
-                    dt = _dt.fromisoformat(interview_time_raw)
+                    dt = datetime.fromisoformat(interview_time_raw)
+                except ValueError:
+                    if _isoparse is None:
+                        raise
+                    dt = _isoparse(interview_time_raw)
                 if dt.tzinfo is None:
                     dt = dt.replace(tzinfo=timezone.utc)
                 else:
@@ -83,20 +102,16 @@ class InterviewManager:
             return None
 
         def convert(value):
-            # ObjectId -> str
-            try:
-                from bson import ObjectId
-            except Exception:
-                ObjectId = None
-            # primitives
-            if value is None or isinstance(value, (str, int, float, bool)):
+            # primitives (exact-type lookup; subclasses fall through to the isinstance checks below)
+            if type(value) in _PRIMITIVE_TYPES:
+                return value
+            if isinstance(value, (str, int, float, bool)):
                 return value
             # ObjectId
-            if ObjectId and isinstance(value, ObjectId):
+            if isinstance(value, ObjectId):
                 return str(value)
             # datetime keep as is
-            from datetime import datetime as _dt
-            if isinstance(value, _dt):
+            if isinstance(value, datetime):
                 return value
             # dict -> recurse
             if isinstance(value, dict):
@@ -112,45 +127,48 @@ class InterviewManager:
 
         return convert(doc)
 
+    # validation + dump are CPU-bound on large documents; start_by_candidate_key runs these via to_thread
+    def _resume_to_dict(self, raw_resume: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Validate a stored resume and return it as a prompt-ready dict (nested ObjectIds as str)."""
+        return self._normalize_doc_to_str(Resume.model_validate(raw_resume).model_dump())
+
+    def _job_description_to_dict(self, job_doc: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Validate a stored job and return its jobDescription as a prompt-ready dict, or None."""
+        jd = Job.model_validate(job_doc).jobDescription
+        return None if jd is None else self._normalize_doc_to_str(jd.model_dump())
+
     def _pick_templates(self, resume: Dict[str, Any], job: Dict[str, Any]) -> Dict[str, str]:
         """
         Return chosen interview_template and evaluation_template.
-        Simple predefined logic: default 'general'/'standard_evaluation_v1', or 'senior' variants if experience >=5.
+        Simple predefined logic: default 'general'/'standard_evaluation_v1', or 'senior' variants if experience >=5
+        or the job's experience level / employment type mentions 'senior'.
+        `job` may be a whole job document or (as passed by start_by_candidate_key) its jobDescription.
         """
-        interview_template = "general"
-        evaluation_template = "standard_evaluation_v1"
-        try:
-            resume_exp = None
-            if isinstance(resume, dict):
-                resume_exp = resume.get("totalExperienceYears") or resume.get("totalExperience")
-            jd = job.get("jobDescription") if job else None
-            jd_level = None
-            if jd and isinstance(jd, dict):
-                jd_level = jd.get("experienceLevel") or jd.get("employmentType")
+        resume_exp = resume.get("totalExperienceYears") or resume.get("totalExperience") if isinstance(resume, dict) else None
+        if isinstance(resume_exp, (int, float)):
+            senior = resume_exp >= 5
+        else:
+            try:
+                senior = bool(resume_exp) and float(resume_exp) >= 5
+            except (TypeError, ValueError):
+                senior = False
 
-            if resume_exp:
-                try:
-                    if float(resume_exp) >= 5:
-                        interview_template = "senior"
-                        evaluation_template = "senior_evaluation_v1"
-                except Exception:
-                    pass
-
-            if jd_level and isinstance(jd_level, str) and "senior" in jd_level.lower():
-                interview_template = "senior"
-                evaluation_template = "senior_evaluation_v1"
-        except Exception:
-            logger.exception("Error choosing templates; falling back to defaults")
+        if not senior and isinstance(job, dict):
+            jd = job.get("jobDescription", job)
+            if isinstance(jd, dict):
+                jd_level = jd.get("experienceLevel") or jd.get("employmentType")
+                senior = isinstance(jd_level, str) and "senior" in jd_level.lower()
 
-        return {"interview_template": interview_template, "evaluation_template": evaluation_template}
+        return _SENIOR_TEMPLATES if senior else _DEFAULT_TEMPLATES
 
     async def start_by_candidate_key(self, candidate_key: str) -> ScheduleResponse:
         """
         Accepts candidate_key (query param), validates schedule time, fetches resume/job,
         constructs prompt + token, and starts the agent.
         """
-        # 1) fetch interview_keys entry
-        interview_doc = self._find_interview_by_candidate_key(candidate_key)
+        # 1) fetch interview_keys entry (with resume and job joined in, one round trip)
+        # pymongo is blocking; run the lookup off the event loop so concurrent starts are not serialized
+        interview_doc = await asyncio.to_thread(self._find_interview_by_candidate_key, candidate_key)
         if not interview_doc:
             raise HTTPException(status_code=404, detail=f"No scheduled interview found for candidateKey={candidate_key}")
 
@@ -165,52 +183,43 @@ class InterviewManager:
                     detail=f"Interview scheduled for {parsed_time.isoformat()} (UTC). It is not yet time to start."
                 )
 
-        # 2) get candidate resume using MongoService helper
-        # the interview_keys doc stores candidate as ObjectId; convert -> str then use get_resume_by_id
-        candidate_field = interview_doc.get("candidate") or interview_doc.get("candidate_id") or interview_doc.get("candidateId")
+        # 2) candidate resume referenced by the interview_keys entry
+        candidate_field = _first(interview_doc, INTERVIEW_CANDIDATE_FIELDS)
         if not candidate_field:
             raise HTTPException(status_code=400, detail="interview_keys entry missing candidate reference")
         candidate_id_str = str(candidate_field)
-        try:
-            raw_resume = self.mongo.get_resume_by_id(candidate_id_str)
-        except Exception:
-            logger.exception("Database error fetching resume for id %s", candidate_id_str)
-            raise HTTPException(status_code=500, detail="Database error fetching candidate resume")
+        # fetched together with the interview entry (see MongoService.get_interview_bundle)
+        raw_resume = interview_doc.get("resume")
 
         if not raw_resume:
             resume_doc = None
         else:
             try:
-                resume_doc = Resume.model_validate(raw_resume).model_dump()
+                resume_doc = await asyncio.to_thread(self._resume_to_dict, raw_resume)
             except Exception:
                 logger.exception("Resume validation failed for id %s", candidate_id_str)
                 raise HTTPException(status_code=500, detail="Invalid resume format")
         if not resume_doc:
             raise HTTPException(status_code=404, detail=f"Candidate resume not found for id {candidate_id_str}")
 
-        # convert resume doc nested ObjectIds to strings (best-effort)
-        resume_doc = self._normalize_doc_to_str(resume_doc)
-
-        # 3) get job description using job id
-        job_field = interview_doc.get("job") or interview_doc.get("job_id") or interview_doc.get("jobId")
+        # 3) job description of the referenced job
+        job_field = _first(interview_doc, INTERVIEW_JOB_FIELDS)
         job_doc = None
         job_id_str = None
         if job_field:
             job_id_str = str(job_field)
             try:
-                job_doc = self.mongo.get_job_by_id(job_id_str)
+                job_doc = interview_doc.get("jobDoc")
                 if not job_doc:
                     job_description = None
                 else:
                     # validate job and extract/normalize jobDescription (if present)
-                    job = Job.model_validate(job_doc)
-                    jd = getattr(job, "jobDescription", None)
-                    job_description = None if jd is None else JobDescription.model_validate(jd).model_dump()
+                    job_description = await asyncio.to_thread(self._job_description_to_dict, job_doc)
             except Exception:
                 logger.exception("Error fetching or validating job for id %s", job_id_str)
                 job_description = None
             if job_description:
-                job_doc = self._normalize_doc_to_str(job_description)
+                job_doc = job_description
             else:
                 logger.warning("Job document not found for id %s; proceeding without job", job_id_str)
 
@@ -220,6 +229,7 @@ class InterviewManager:
         evaluation_template = templates["evaluation_template"]
 
         # The create_interview_prompt expects resume, job_description, interview_template
+        # (a single format of a precomputed template; cheaper inline than a thread hop)
         try:
             agent_instructions = prompt_builder.create_interview_prompt(
                 resume=resume_doc,
@@ -237,37 +247,37 @@ class InterviewManager:
         agent_id_field = interview_doc.get("agentId")
         agent_id_to_pass = str(agent_id_field) if agent_id_field is not None else None
 
-        room_name = f"interview-{uuid.uuid4()}"
-        agent_name = f"agent-{uuid.uuid4()}"
+        # one 256-bit draw split into two independent 128-bit names
+        rand_hex = secrets.token_hex(32)
+        room_name = f"interview-{rand_hex[:32]}"
+        agent_name = f"agent-{rand_hex[32:]}"
 
-        token = create_token_with_agent_dispatch(
+        # JWT signing runs in a thread while the agent worker is started (step 6)
+        token_task = asyncio.ensure_future(asyncio.to_thread(
+            create_token_with_agent_dispatch,
             agent_name=agent_name,
             room_name=room_name,
             metadata={"prompt": agent_instructions, "agent_id": agent_id_to_pass},
             identity=candidate_id_str,
+        ))
+
+        # 6) start the agent via registry. start_now takes **worker_kwargs, so there is no signature
+        # mismatch to fall back from; a TypeError would come from inside the start and must surface
+        start_agent = agent_registry.start_now(
+            agent_name=agent_name,
+            entrypoint=entrypoint,
+            prewarm=prewarm,
+            room_name=room_name,
         )
 
+        token, (mgr, started) = await asyncio.gather(token_task, start_agent)
+
         if not token:
             logger.error("Failed to create LiveKit token for agent dispatch for candidate_key=%s", candidate_key)
+            # nobody can join without a token; don't leave the worker running
+            await agent_registry.stop_agent(agent_name)
             raise HTTPException(status_code=500, detail="Failed to create access token for interview.")
 
-        # 6) start the agent via registry (following your instruction — call start_now as shown)
-        try:
-            mgr, started = await agent_registry.start_now(
-                agent_name=agent_name,
-                entrypoint=entrypoint,
-                room_name=room_name,
-            )
-        except TypeError:
-            # fallback to start_now with token if your registry requires it; preserve behavior
-            logger.debug("agent_registry.start_now rejected call without token; retrying with token included")
-            mgr, started = await agent_registry.start_now(
-                agent_name=agent_name,
-                entrypoint=entrypoint,
-                room_name=room_name,
-                token=token,
-            )
-
         scheduled_time = datetime.now(timezone.utc)
         message = "Agent started immediately. Awaiting candidate to join."
         if not started:
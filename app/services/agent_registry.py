@@ -32,6 +32,7 @@ class AgentRegistry:
         agent_name: str,
         entrypoint: Callable[..., Any],
         start_time: datetime,
+        prewarm: Optional[Callable[..., Any]] = None,
         **worker_kwargs,
     ):
         """
@@ -52,7 +53,7 @@ class AgentRegistry:
             if agent_name in self._registry or agent_name in self._scheduled_tasks:
                 raise RuntimeError(f"Agent {agent_name} already exists")
 
-            mgr = AgentManager(agent_name, entrypoint)
+            mgr = AgentManager(agent_name, entrypoint, prewarm=prewarm)
             self._registry[agent_name] = mgr
 
         async def _delayed_start():
@@ -67,8 +68,7 @@ class AgentRegistry:
                         logger.warning(f"[{agent_name}] already running at scheduled time")
 
                     # Wait for agent to finish
-                    while mgr.is_running():
-                        await asyncio.sleep(1)
+                    await mgr.wait_finished()
 
                 logger.info(f"[{agent_name}] finished execution")
             except asyncio.CancelledError:
@@ -92,6 +92,7 @@ class AgentRegistry:
         self,
         agent_name: str,
         entrypoint: Callable[..., Any],
+        prewarm: Optional[Callable[..., Any]] = None,
         **worker_kwargs,
     ) -> Tuple[AgentManager, bool]:
         """
@@ -111,7 +112,7 @@ class AgentRegistry:
                 return existing, False
 
             # create and store manager (either new or replace stale)
-            mgr = AgentManager(agent_name, entrypoint)
+            mgr = AgentManager(agent_name, entrypoint, prewarm=prewarm)
             self._registry[agent_name] = mgr
 
         # Acquire a concurrency slot and start the worker
@@ -124,8 +125,7 @@ class AgentRegistry:
         # spawn monitor task to cleanup when run completes (so we behave like scheduled runs)
         async def _monitor():
             try:
-                while mgr.is_running():
-                    await asyncio.sleep(1)
+                await mgr.wait_finished()
                 logger.info(f"[{agent_name}] monitor detected run finished")
             except asyncio.CancelledError:
                 logger.info(f"[{agent_name}] monitor cancelled")
@@ -175,8 +175,9 @@ class AgentRegistry:
 
     async def active_count(self) -> int:
         """Return number of currently running agents."""
-        async with self._lock:
-            return sum(1 for m in self._registry.values() if m.is_running())
+        # no await inside the scan, so it cannot interleave with registry mutations on this loop;
+        # taking self._lock here would only queue a read-only healthcheck behind start/stop
+        return sum(1 for m in self._registry.values() if m.is_running())
 
     async def stop_all(self, timeout: float = 30.0):
         """Stops all agents and cancels all scheduled starts/monitors."""
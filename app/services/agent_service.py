@@ -2,7 +2,7 @@
 import asyncio
 import logging
 from datetime import datetime, timedelta, timezone
-from typing import Optional, Callable, Any
+from typing import Optional, Callable, Any, Set
 
 from livekit.agents import Worker, WorkerOptions
 from app.core.configs import config  # adjust if your config path differs
@@ -13,22 +13,30 @@ logger.setLevel(logging.INFO)
 class AgentManager:
     """
     Minimal AgentManager for a single agent_name + provided entrypoint.
-    - Construct with (agent_name: str, entrypoint: Callable[..., Any])
+    - Construct with (agent_name: str, entrypoint: Callable[..., Any], prewarm: Optional[Callable[..., Any]])
     - run_now() -> starts Worker.run()
     - schedule_in(delay_seconds) / schedule_at(start_time) -> schedule a future run
     - stop() -> attempt graceful shutdown via worker.aclose() and cancel the runner task
     """
 
-    def __init__(self, agent_name: str, entrypoint: Callable[..., Any]):
+    def __init__(self, agent_name: str, entrypoint: Callable[..., Any], prewarm: Optional[Callable[..., Any]] = None):
         self.agent_name = agent_name
         self.entrypoint = entrypoint
+        # optional per-process init hook (WorkerOptions.prewarm_fnc)
+        self.prewarm = prewarm
 
         # Only one active run per AgentManager instance (per agent_name)
         self._runner_task: Optional[asyncio.Task] = None
         self._worker: Optional[Worker] = None
 
-        # lock to avoid races on start/stop
+        # guards the check-and-start in run_now and the snapshot in stop; other state updates are
+        # plain assignments with no await in between, which cannot interleave on the event loop
         self._lock = asyncio.Lock()
+        # set when the current runner task completes (see wait_finished)
+        self._done = asyncio.Event()
+        self._done.set()
+        # run_now tasks launched by schedule_in timers
+        self._start_tasks: Set[asyncio.Task] = set()
 
     def _make_worker(self, **kwargs) -> Worker:
         """
@@ -36,13 +44,16 @@ class AgentManager:
         This assumes you have LIVEKIT_URL/API_KEY/API_SECRET in config.
         If you need additional WorkerOptions values, pass them via kwargs.
         """
-        opts = WorkerOptions(
+        opts_kwargs = dict(
             entrypoint_fnc=self.entrypoint,
             ws_url=getattr(config, "LIVEKIT_URL", None),
             agent_name=self.agent_name,
             api_key=getattr(config, "LIVEKIT_API_KEY", None),
             api_secret=getattr(config, "LIVEKIT_API_SECRET", None),
         )
+        if self.prewarm is not None:
+            opts_kwargs["prewarm_fnc"] = self.prewarm
+        opts = WorkerOptions(**opts_kwargs)
         return Worker(opts=opts)
 
     async def run_now(self, **worker_kwargs) -> bool:
@@ -60,11 +71,9 @@ class AgentManager:
                 try:
                     logger.info(f"[{self.agent_name}] creating Worker")
                     worker = self._make_worker(**worker_kwargs)
-                    # expose worker so stop() can access it
-                    async with self._lock:
-                        self._worker = worker
-                        # store reference to current asyncio Task
-                        self._runner_task = asyncio.current_task()
+                    # expose worker so stop() can access it (run_now already stored this task);
+                    # a plain assignment with no await around it needs no lock on the event loop
+                    self._worker = worker
 
                     logger.info(f"[{self.agent_name}] starting worker.run()")
                     # run() should block until the worker completes its lifecycle
@@ -83,34 +92,41 @@ class AgentManager:
                     logger.exception(f"[{self.agent_name}] unexpected exception in runner")
                 finally:
                     # cleanup
-                    async with self._lock:
-                        self._worker = None
-                        # if task is still the same stored task, clear it
-                        if self._runner_task and self._runner_task.done():
-                            self._runner_task = None
-                        logger.info(f"[{self.agent_name}] cleaned up runner state")
+                    self._worker = None
+                    # if task is still the same stored task, clear it
+                    if self._runner_task and self._runner_task.done():
+                        self._runner_task = None
+                    logger.info(f"[{self.agent_name}] cleaned up runner state")
 
             # create and store the task
             task = asyncio.create_task(_runner(), name=f"agent-runner:{self.agent_name}")
             self._runner_task = task
+            # done-callback rather than the runner's finally: also fires if cancelled before it starts
+            self._done.clear()
+            task.add_done_callback(self._on_runner_done)
             logger.info(f"[{self.agent_name}] scheduled to run now")
             return True
 
-    async def schedule_in(self, delay_seconds: float, **worker_kwargs) -> asyncio.Task:
+    def _on_runner_done(self, task: asyncio.Task) -> None:
+        # a run dropped by stop_and_forget may finish after a newer run started; only the current run signals
+        if self._runner_task is task or self._runner_task is None:
+            self._done.set()
+
+    async def schedule_in(self, delay_seconds: float, **worker_kwargs) -> asyncio.TimerHandle:
         """
-        Schedule agent start after delay_seconds. Returns the scheduling task (so caller may cancel it).
+        Schedule agent start after delay_seconds. Returns the loop timer handle (so caller may cancel it).
         """
-        async def _delayed():
-            try:
-                logger.info(f"[{self.agent_name}] scheduled to start in {delay_seconds:.1f}s")
-                await asyncio.sleep(max(0.0, delay_seconds))
-                await self.run_now(**worker_kwargs)
-            except asyncio.CancelledError:
-                logger.info(f"[{self.agent_name}] scheduled start cancelled before launching")
+        def _launch():
+            # keep a reference until run_now finishes; the loop only holds tasks weakly
+            task = asyncio.create_task(self.run_now(**worker_kwargs), name=f"agent-scheduler:{self.agent_name}")
+            self._start_tasks.add(task)
+            task.add_done_callback(self._start_tasks.discard)
 
-        return asyncio.create_task(_delayed(), name=f"agent-scheduler:{self.agent_name}")
+        logger.info(f"[{self.agent_name}] scheduled to start in {delay_seconds:.1f}s")
+        # a loop timer instead of a task sleeping until the start time
+        return asyncio.get_running_loop().call_later(max(0.0, delay_seconds), _launch)
 
-    async def schedule_at(self, start_time: datetime, **worker_kwargs) -> asyncio.Task:
+    async def schedule_at(self, start_time: datetime, **worker_kwargs) -> asyncio.TimerHandle:
         """
         Schedule the agent to start at a specific datetime.
         If naive datetime is passed, it is treated as local time.
@@ -143,9 +159,7 @@ class AgentManager:
         if worker is not None:
             try:
                 logger.info(f"[{self.agent_name}] attempting worker.aclose() for graceful shutdown")
-                maybe = worker.aclose()
-                if asyncio.iscoroutine(maybe):
-                    await maybe
+                await worker.aclose()
                 logger.info(f"[{self.agent_name}] worker.aclose() completed")
             except Exception:
                 logger.exception(f"[{self.agent_name}] error during worker.aclose(); will cancel runner task")
@@ -164,9 +178,8 @@ class AgentManager:
                 logger.info(f"[{self.agent_name}] runner cancelled successfully")
 
         # final cleanup
-        async with self._lock:
-            self._runner_task = None
-            self._worker = None
+        self._runner_task = None
+        self._worker = None
 
         logger.info(f"[{self.agent_name}] stopped and cleaned up")
         return True
@@ -176,11 +189,8 @@ class AgentManager:
         Force cleanup without waiting: attempt aclose, cancel task and clear references.
         Use with caution.
         """
-        async with self._lock:
-            task = self._runner_task
-            worker = self._worker
-            self._runner_task = None
-            self._worker = None
+        task, self._runner_task = self._runner_task, None
+        worker, self._worker = self._worker, None
 
         if worker is not None:
             try:
@@ -198,3 +208,10 @@ class AgentManager:
         """
         t = self._runner_task
         return bool(t and not t.done())
+
+    async def wait_finished(self) -> None:
+        """
+        Wait until the current run finishes (returns immediately if not running).
+        """
+        if self.is_running():
+            await self._done.wait()
@@ -7,6 +7,24 @@ from app.core.configs import config
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("Dispatch")
 
+# one LiveKit API client (and its HTTP connection pool) for the process; created on first use
+_lkapi: Optional[api.LiveKitAPI] = None
+
+
+def _get_lkapi() -> api.LiveKitAPI:
+    global _lkapi
+    if _lkapi is None:
+        _lkapi = api.LiveKitAPI(url=config.LIVEKIT_URL, api_key=config.LIVEKIT_API_KEY, api_secret=config.LIVEKIT_API_SECRET)
+    return _lkapi
+
+
+async def close_lkapi() -> None:
+    """Close the shared LiveKit API client (call once at app shutdown)."""
+    global _lkapi
+    lkapi, _lkapi = _lkapi, None
+    if lkapi is not None:
+        await lkapi.aclose()
+
 def generate_token(identity: str, name: str, room: str) -> str:
     """Generates a LiveKit JWT token for a participant.""" 
     access_token = (
@@ -24,16 +42,8 @@ async def create_agent_dispatch(
     prompt: str,
 ) -> Optional[api.AgentDispatch]:
 
-    if prompt:
-        metadata = {
-                    "prompt": prompt, 
-                    }
-    else:
-        metadata["prompt"] = "Your and interview agent named karan"
+    metadata = {"prompt": prompt or "Your and interview agent named karan"}
 
-    # Create API client
-    lkapi = api.LiveKitAPI(url=config.LIVEKIT_URL, api_key=config.LIVEKIT_API_KEY, api_secret=config.LIVEKIT_API_SECRET)
-    
     try:
         request = api.CreateAgentDispatchRequest(
             agent_name=agent_name,
@@ -41,17 +51,13 @@ async def create_agent_dispatch(
             metadata=json.dumps(metadata),
         )
         
-        # Create the dispatch
-        dispatch = await lkapi.agent_dispatch.create_dispatch(request)
+        # Create the dispatch (shared client; closed by close_lkapi at shutdown)
+        dispatch = await _get_lkapi().agent_dispatch.create_dispatch(request)
         return dispatch
         
     except Exception as e:
         logger.error(f"Failed to create agent dispatch: {e}")
         return None
-        
-    finally:
-        # Always close the API client
-        await lkapi.aclose()
 
 from livekit.api import (
   AccessToken,
@@ -1,7 +1,8 @@
 import re
 import json
 import logging
-from openai import OpenAI
+import orjson
+from openai import AsyncOpenAI
 
 # Configure a logger for this module
 logger = logging.getLogger(__name__)
@@ -10,12 +11,16 @@ logger = logging.getLogger(__name__)
 # In a real app, API keys should be managed securely (e.g., via config).
 try:
     # Using AsyncOpenAI for non-blocking API calls in an async FastAPI context
-    client = OpenAI()
+    # (one client per process, so its HTTP connection pool is reused across evaluations)
+    client = AsyncOpenAI(max_retries=2, timeout=60.0)
     MODEL = "gpt-4o-mini"
 except Exception as e:
     logger.error(f"Failed to initialize OpenAI client: {e}")
     client = None
 
+# outermost {...} block in model output that has text around the JSON
+_RE_JSON_OBJECT = re.compile(r'\{.*\}', re.DOTALL)
+
 def _safe_parse_json(text: str) -> dict | None:
     """
     Safely attempts to parse a JSON string, extracting the first valid JSON object
@@ -23,13 +28,14 @@ def _safe_parse_json(text: str) -> dict | None:
     """
     try:
         # First, try to load the whole string
-        return json.loads(text)
+        return orjson.loads(text)
     except json.JSONDecodeError:
         # If that fails, search for a JSON object within the string
-        match = re.search(r'\{.*\}', text, re.DOTALL)
+        # (orjson.JSONDecodeError subclasses json.JSONDecodeError)
+        match = _RE_JSON_OBJECT.search(text)
         if match:
             try:
-                return json.loads(match.group(0))
+                return orjson.loads(match.group(0))
             except json.JSONDecodeError:
                 logger.warning("Found a JSON-like block but failed to parse it.")
                 return None
@@ -59,7 +65,7 @@ async def evaluate_interview_transcript(
     # Construct the prompts
     system_prompt = evaluation_template
     user_prompt = (
-        f"Transcript JSON:\n{json.dumps(transcript, indent=2)}\n\n"
+        f"Transcript JSON:\n{orjson.dumps(transcript, option=orjson.OPT_INDENT_2).decode()}\n\n"
         f"Job Description:\n{job_description}\n\n"
         f"Candidate Resume:\n{resume_text}\n\n"
         "Please return the evaluation JSON exactly as required by the system prompt."
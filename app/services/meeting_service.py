@@ -1,10 +1,30 @@
 import uuid
-import requests
+from typing import Optional
 from urllib.parse import quote_plus
+import httpx
 from livekit import api
 
 from app.core.configs import config
 
+# shared keep-alive client for TinyURL calls (created on first use, inside the running loop)
+_tiny_client: Optional[httpx.AsyncClient] = None
+
+
+def _get_tiny_client() -> httpx.AsyncClient:
+    global _tiny_client
+    if _tiny_client is None:
+        _tiny_client = httpx.AsyncClient(timeout=5.0, limits=httpx.Limits(max_keepalive_connections=32))
+    return _tiny_client
+
+
+async def close_tiny_client() -> None:
+    """Close the shared TinyURL client (call once at app shutdown)."""
+    global _tiny_client
+    client, _tiny_client = _tiny_client, None
+    if client is not None:
+        await client.aclose()
+
+
 def _generate_token(identity: str, name: str, room: str) -> str:
     """Generates a LiveKit JWT token for a participant.""" 
     access_token = (
@@ -15,7 +35,7 @@ def _generate_token(identity: str, name: str, room: str) -> str:
     )
     return access_token.to_jwt()
 
-def _get_tiny_url(long_url: str) -> str:
+async def _get_tiny_url(long_url: str) -> str:
     """Shortens a URL using the TinyURL API."""
     if not config.TINYURL_API_KEY:
         # If no key, return the long URL as a fallback
@@ -29,14 +49,14 @@ def _get_tiny_url(long_url: str) -> str:
     payload = {"url": long_url}
 
     try:
-        response = requests.post(api_url, headers=headers, json=payload, timeout=5)
+        response = await _get_tiny_client().post(api_url, headers=headers, json=payload)
         response.raise_for_status()
         data = response.json()
         return data.get("data", {}).get("tiny_url", long_url)
-    except requests.exceptions.RequestException:
+    except httpx.HTTPError:
         return long_url
 
-def create_meeting_link(room_name: str, participant_name: str) -> str:
+async def create_meeting_link(room_name: str, participant_name: str) -> str:
     """
     Creates a unique, shareable meeting link for a participant.
     """
@@ -51,5 +71,5 @@ def create_meeting_link(room_name: str, participant_name: str) -> str:
     )
     
     # Shorten the URL for easier sharing
-    short_link = _get_tiny_url(meet_link)
+    short_link = await _get_tiny_url(meet_link)
     return short_link
@@ -1,25 +1,29 @@
-import os
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from pymongo import MongoClient
 from bson import ObjectId
 import logging
-from dotenv import load_dotenv
 from app.schemas import RankedResumeOut , CandidateResume
-load_dotenv()
 from datetime import datetime
-from pymongo import ASCENDING, ReturnDocument
+from pymongo import ASCENDING, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
 from typing import Union
-# from app.core.config import config
+from app.core.configs import config
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
+# spellings of the candidate / job references found on interview_keys entries, in lookup order
+INTERVIEW_CANDIDATE_FIELDS = ("candidate", "candidate_id", "candidateId")
+INTERVIEW_JOB_FIELDS = ("job", "job_id", "jobId")
+# interview_keys fields read when starting an interview
+_INTERVIEW_KEY_FIELDS = ("interviewTime", "agentId") + INTERVIEW_CANDIDATE_FIELDS + INTERVIEW_JOB_FIELDS
+
 
 class MongoService:
     """
     A simple MongoDB service wrapper.
 
-    - Reads connection URI from environment variable MONOGO_DB_URL (fallback to MONGO_DB_URL).
+    - Reads connection URI from the shared settings (config.MONGO_DB_URL).
     - Reuses a single MongoClient instance.
     - Provides collection-specific helpers for:
       - candidates (resumes)
@@ -36,8 +40,7 @@ class MongoService:
         :param connection_env_names: list of env var names to try for connection string
         :param kwargs: forwarded to MongoClient (optional)
         """
-        # conn_uri = config.MONGO_DB_URL  # default from config
-        conn_uri= os.getenv("MONGO_DB_URL", "mongodb://localhost:27017")
+        conn_uri = config.MONGO_DB_URL
         if not conn_uri:
             raise EnvironmentError(
                 f"No MongoDB connection string found in environment variables {connection_env_names}"
@@ -53,6 +56,7 @@ class MongoService:
         self.question_coll_name = "questionstemplates"
         self.agents = "agents"
         self.recommendations_coll_name = "recommendations"
+        self.interview_keys_coll_name = "interview_keys"
 
         logger.info("MongoService connected to database '%s'", db_name)
 
@@ -64,6 +68,17 @@ class MongoService:
         except Exception as e:
             logger.exception("Error closing MongoClient: %s", e)
 
+    def ensure_indexes(self) -> None:
+        """
+        Create the indexes the request paths rely on (idempotent; call once at startup).
+        Failures are logged, not raised: a missing index slows queries but does not break them.
+        """
+        try:
+            # interview start looks entries up by candidateKey
+            self._get_collection(self.interview_keys_coll_name).create_index([("candidateKey", ASCENDING)])
+        except Exception as e:
+            logger.exception("Error creating indexes: %s", e)
+
     # -----------------------
     # Generic helpers
     # -----------------------
@@ -197,7 +212,7 @@ class MongoService:
                     out[k] = v
         return out
 
-    def get_by_id(self, collection_name: str, object_id: str) -> Optional[Dict[str, Any]]:
+    def get_by_id(self, collection_name: str, object_id: str, projection: Dict[str, Any] = None) -> Optional[Dict[str, Any]]:
         """
         Generic getter by ObjectId string.
         Returns serialized dict or None if not found/invalid id.
@@ -205,13 +220,14 @@ class MongoService:
         try:
             coll = self._get_collection(collection_name)
             oid = ObjectId(object_id)
-            doc = coll.find_one({"_id": oid})
+            doc = coll.find_one({"_id": oid}, projection)
             return self._serialize_document(doc) if doc else None
         except Exception as e:
             logger.exception("Error in get_by_id for collection %s id=%s: %s", collection_name, object_id, e)
             return None
 
-    def get_all(self, collection_name: str, filter_query: Dict[str, Any] = None, limit: int = 0, sort: list = None) -> List[Dict[str, Any]]:
+    def get_all(self, collection_name: str, filter_query: Dict[str, Any] = None, limit: int = 0, sort: list = None,
+                projection: Dict[str, Any] = None) -> List[Dict[str, Any]]:
         """
         Generic get-all (with optional filter and limit).
         Returns a list of serialized documents.
@@ -222,7 +238,7 @@ class MongoService:
         try:
             coll = self._get_collection(collection_name)
             query = filter_query or {}
-            cursor = coll.find(query)
+            cursor = coll.find(query, projection)
             if sort:
                 cursor = cursor.sort(sort)
             if limit and limit > 0:
@@ -233,21 +249,93 @@ class MongoService:
             logger.exception("Error in get_all for collection %s: %s", collection_name, e)
             return []
 
+    def iter_all(
+        self,
+        collection_name: str,
+        filter_query: Dict[str, Any] = None,
+        projection: Dict[str, Any] = None,
+        batch_size: int = 500,
+        sort: list = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Like get_all, but yields serialized documents while the cursor is iterated
+        (fetched from the server `batch_size` at a time) instead of building the full list.
+        :param projection: pymongo projection to fetch only the fields the caller needs
+        """
+        coll = self._get_collection(collection_name)
+        cursor = coll.find(filter_query or {}, projection, batch_size=batch_size)
+        if sort:
+            cursor = cursor.sort(sort)
+        for doc in cursor:
+            yield self._serialize_document(doc)
+
     # -----------------------
     # Resumes (candidates) specific
     # -----------------------
+    @staticmethod
+    def _resume_default_projection() -> Dict[str, Any]:
+        """Resume reads leave out the stored ranking embedding (large, and meaningless to callers)."""
+        return {config.RESUME_EMBEDDING_FIELD: 0}
+
     def get_resume_by_id(self, object_id: str) -> Optional[Dict[str, Any]]:
         """
         Return a candidate resume document by ObjectId string.
         """
-        return self.get_by_id(self.resumes_coll_name, object_id)
+        return self.get_by_id(self.resumes_coll_name, object_id, self._resume_default_projection())
 
     def get_all_resumes(self, filter_query: Dict[str, Any] = None, limit: int = 0) -> List[Dict[str, Any]]:
         """
         Return all candidate resumes (optionally filtered).
         """
         sort=[("createdAt",-1)]
-        return self.get_all(self.resumes_coll_name, filter_query, limit,sort)
+        return self.get_all(self.resumes_coll_name, filter_query, limit,sort, self._resume_default_projection())
+
+    def iter_all_resumes(
+        self,
+        filter_query: Dict[str, Any] = None,
+        projection: Dict[str, Any] = None,
+        batch_size: int = 500,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream candidate resumes (optionally filtered and projected) without materializing the collection.
+        """
+        return self.iter_all(self.resumes_coll_name, filter_query, projection or self._resume_default_projection(), batch_size)
+
+    def vector_search_resumes(
+        self,
+        index: str,
+        query_vector: List[float],
+        limit: int,
+        filter_query: Dict[str, Any] = None,
+        projection: Dict[str, Any] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Top-`limit` resumes by similarity to `query_vector`, computed server-side with Atlas $vectorSearch
+        over config.RESUME_EMBEDDING_FIELD. Each returned document carries its "score".
+        Fields used in `filter_query` must be declared as filter fields on the index.
+        """
+        stage: Dict[str, Any] = {
+            "index": index,
+            "path": config.RESUME_EMBEDDING_FIELD,
+            "queryVector": query_vector,
+            "numCandidates": min(10000, max(limit * 20, 100)),
+            "limit": limit,
+        }
+        if filter_query:
+            stage["filter"] = filter_query
+        project = dict(projection or {})
+        project["score"] = {"$meta": "vectorSearchScore"}
+        coll = self._get_collection(self.resumes_coll_name)
+        return [self._serialize_document(doc) for doc in coll.aggregate([{"$vectorSearch": stage}, {"$project": project}])]
+
+    def set_resume_embeddings(self, embeddings: List[Tuple[str, List[float]]]) -> None:
+        """Store (resume id, embedding) pairs with one unordered bulk_write."""
+        ops = [
+            UpdateOne({"_id": ObjectId(resume_id)}, {"$set": {config.RESUME_EMBEDDING_FIELD: vector}})
+            for resume_id, vector in embeddings
+        ]
+        if ops:
+            self._get_collection(self.resumes_coll_name).bulk_write(ops, ordered=False)
 
     # -----------------------
     # Job description templates specific
@@ -263,6 +351,43 @@ class MongoService:
     def get_agent_config_by_id(self, object_id: str) -> Optional[Dict[str, Any]]:
         return self.get_by_id(self.agents, object_id)
 
+    # -----------------------
+    # Interview keys specific
+    # -----------------------
+    def get_interview_bundle(self, candidate_key: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the interview_keys entry for `candidate_key` with its candidate resume under "resume"
+        and its job under "jobDoc" (absent when the reference is missing or dangling), joined
+        server-side with $lookup so the interview start costs a single round trip.
+        Returns None if no entry exists; database errors propagate to the caller.
+        """
+        def _ref(*fields: str) -> Dict[str, Any]:
+            # first reference field that is set (not missing, null or "", like _first in the interview
+            # manager), as ObjectId; unconvertible values become null (never match)
+            expr: Any = None
+            for field in reversed(fields):
+                ref = "$" + field
+                expr = {"$cond": [{"$ne": [{"$ifNull": [ref, ""]}, ""]}, ref, expr]}
+            return {"$convert": {"input": expr, "to": "objectId", "onError": None, "onNull": None}}
+
+        def _lookup(coll_name: str, ref: Dict[str, Any], as_field: str, projection: Dict[str, Any] = None):
+            pipeline: List[Dict[str, Any]] = [{"$match": {"$expr": {"$eq": ["$_id", "$$ref"]}}}, {"$limit": 1}]
+            if projection:
+                pipeline.append({"$project": projection})
+            return {"$lookup": {"from": coll_name, "let": {"ref": ref}, "pipeline": pipeline, "as": as_field}}
+
+        pipeline = [
+            {"$match": {"candidateKey": candidate_key}},
+            {"$limit": 1},
+            {"$project": dict.fromkeys(_INTERVIEW_KEY_FIELDS, 1)},
+            _lookup(self.resumes_coll_name, _ref(*INTERVIEW_CANDIDATE_FIELDS), "resume",
+                    self._resume_default_projection()),
+            _lookup(self.jobdesc_coll_name, _ref(*INTERVIEW_JOB_FIELDS), "jobDoc"),
+            {"$set": {"resume": {"$arrayElemAt": ["$resume", 0]}, "jobDoc": {"$arrayElemAt": ["$jobDoc", 0]}}},
+        ]
+        docs = list(self._get_collection(self.interview_keys_coll_name).aggregate(pipeline))
+        return self._serialize_document(docs[0]) if docs else None
+
     # -----------------------
     # Question templates specific
     # -----------------------
@@ -341,75 +466,93 @@ class MongoService:
 
         return self._serialize_document(result) if result else None
 
+    def _build_resume_upsert(
+        self,
+        owner_id: str,
+        parsed_data: Union[Dict[str, Any], CandidateResume],
+    ) -> Optional[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        """
+        Build the (filter, update) pair used to upsert a parsed resume.
+
+        - Uses 'owner_id' and 'phone' from parsed_data as the unique key.
+        - Applies Mongoose pre-save logic (syncing fields).
+        - Converts simplified date strings (from parser) back to datetime objects
+          for legacy fields (internships, projects, accomplishments).
+        - Returns None if the payload cannot be keyed (missing phone / invalid owner).
+        """
+        now = datetime.utcnow()
+
+        if hasattr(parsed_data, "model_dump"):
+            data = parsed_data.model_dump()
+        elif isinstance(parsed_data, dict):
+            data = parsed_data
+        else:
+            logger.error("Unsupported type for parsed_data: %s", type(parsed_data))
+            return None
+
+        phone = data.get("phone")
+        if not phone:
+            logger.error("Cannot upsert resume: 'phone' is missing or empty in parsed data.")
+            return None
+
+        owner_oid = self._to_objectid(owner_id)
+        if not owner_oid:
+            logger.error("Cannot upsert resume: 'owner_id' is invalid: %s", owner_id)
+            return None
+
+        filter_query = {
+            "phone": phone,
+            "owner": owner_oid
+        }
+
+        payload = data.copy()
+        self._sync_candidate_fields(payload)
+
+        for item in payload.get('internships') or []:
+            item['startDate'] = self._to_datetime_safe(item.get('startDate'))
+            item['endDate'] = self._to_datetime_safe(item.get('endDate'))
+
+        for item in payload.get('projects') or []:
+            item['startDate'] = self._to_datetime_safe(item.get('startDate'))
+            item['endDate'] = self._to_datetime_safe(item.get('endDate'))
+
+        for item in payload.get('accomplishments') or []:
+            item['date'] = self._to_datetime_safe(item.get('date'))
+
+        payload['updatedAt'] = now
+
+        if 'phone' in payload:
+            del payload['phone']
+        if 'owner' in payload:
+            del payload['owner'] # 'owner' isn't in parsed_data, but good to have
+
+        update_op = {
+            "$set": payload,  # 'payload' no longer contains 'phone'
+            "$setOnInsert": {
+                "createdAt": now,
+                "phone": phone, # This is now the *only* operator touching 'phone'
+                "owner": owner_oid # This is the *only* operator touching 'owner'
+            },
+            # content changed: drop the stored ranking embedding so the next ranking pass recomputes it
+            "$unset": {config.RESUME_EMBEDDING_FIELD: ""},
+        }
+        return filter_query, update_op
+
     def upsert_resume(
             self, 
             owner_id: str, 
             parsed_data: Union[Dict[str, Any], CandidateResume]
         ) -> Optional[Dict[str, Any]]:
             """
-            Upserts a candidate resume based on parsed data.
-
-            - Uses 'owner_id' and 'phone' from parsed_data as the unique key.
-            - Applies Mongoose pre-save logic (syncing fields).
-            - Converts simplified date strings (from parser) back to datetime objects
-            for legacy fields (internships, projects, accomplishments).
-            - Returns the serialized, upserted document.
+            Upserts a candidate resume based on parsed data (see _build_resume_upsert).
+            Returns the serialized, upserted document.
             """
             coll = self._get_collection(self.resumes_coll_name)
-            now = datetime.utcnow()
-
-            if hasattr(parsed_data, "model_dump"):
-                data = parsed_data.model_dump()
-            elif isinstance(parsed_data, dict):
-                data = parsed_data
-            else:
-                logger.error("Unsupported type for parsed_data: %s", type(parsed_data))
+            built = self._build_resume_upsert(owner_id, parsed_data)
+            if built is None:
                 return None
-
-            phone = data.get("phone")
-            if not phone:
-                logger.error("Cannot upsert resume: 'phone' is missing or empty in parsed data.")
-                return None
-                
-            owner_oid = self._to_objectid(owner_id)
-            if not owner_oid:
-                logger.error("Cannot upsert resume: 'owner_id' is invalid: %s", owner_id)
-                return None
-
-            filter_query = {
-                "phone": phone,
-                "owner": owner_oid
-            }
-            
-            payload = data.copy()
-            self._sync_candidate_fields(payload)
-            
-            for item in payload.get('internships') or []:
-                item['startDate'] = self._to_datetime_safe(item.get('startDate'))
-                item['endDate'] = self._to_datetime_safe(item.get('endDate'))
-                
-            for item in payload.get('projects') or []:
-                item['startDate'] = self._to_datetime_safe(item.get('startDate'))
-                item['endDate'] = self._to_datetime_safe(item.get('endDate'))
-
-            for item in payload.get('accomplishments') or []:
-                item['date'] = self._to_datetime_safe(item.get('date'))
-            
-            payload['updatedAt'] = now
-
-            if 'phone' in payload:
-                del payload['phone']
-            if 'owner' in payload:
-                del payload['owner'] # 'owner' isn't in parsed_data, but good to have
-
-            update_op = {
-                "$set": payload,  # 'payload' no longer contains 'phone'
-                "$setOnInsert": {
-                    "createdAt": now,
-                    "phone": phone, # This is now the *only* operator touching 'phone'
-                    "owner": owner_oid # This is the *only* operator touching 'owner'
-                }
-            }
+            filter_query, update_op = built
+            phone = filter_query["phone"]
 
             try:
                 result = coll.find_one_and_update(
@@ -422,4 +565,69 @@ class MongoService:
                 return self._serialize_document(result)
             except Exception as e:
                 logger.error("Error upserting resume for phone %s: %s", phone, e)
-                raise e
\ No newline at end of file
+                raise e
+
+    def bulk_upsert_resumes(
+        self,
+        owner_id: str,
+        parsed_items: List[Union[Dict[str, Any], CandidateResume]],
+    ) -> Tuple[List[Optional[Dict[str, Any]]], Dict[int, str]]:
+        """
+        Upsert many parsed resumes with a single unordered bulk_write.
+
+        Returns (docs, failed):
+        - docs is aligned with `parsed_items`; each entry is the serialized {"_id", "phone"} of the
+          stored document, or None if the item could not be keyed or was not written.
+        - failed maps the index (in `parsed_items`) of every op the server rejected to its error message.
+        With ordered=False the server applies every other op, so individual write errors are reported
+        here instead of failing the batch. Whole-batch errors (network, write concern) are raised.
+        """
+        coll = self._get_collection(self.resumes_coll_name)
+        ops: List[UpdateOne] = []
+        op_items: List[int] = []  # op index -> index in parsed_items
+        filters: List[Optional[Dict[str, Any]]] = []
+        for item_idx, parsed in enumerate(parsed_items):
+            built = self._build_resume_upsert(owner_id, parsed)
+            if built is None:
+                filters.append(None)
+                continue
+            filter_query, update_op = built
+            filters.append(filter_query)
+            ops.append(UpdateOne(filter_query, update_op, upsert=True))
+            op_items.append(item_idx)
+
+        failed: Dict[int, str] = {}
+        if not ops:
+            return [None] * len(parsed_items), failed
+
+        try:
+            coll.bulk_write(ops, ordered=False)
+        except BulkWriteError as e:
+            details = e.details or {}
+            write_errors = details.get("writeErrors") or []
+            if details.get("writeConcernErrors") or not write_errors:
+                logger.error("Error bulk upserting %d resumes for owner %s: %s", len(ops), owner_id, e)
+                raise
+            for err in write_errors:
+                failed[op_items[err["index"]]] = err.get("errmsg", "write error")
+            logger.warning("Bulk upsert for owner %s: %d of %d resumes rejected", owner_id, len(failed), len(ops))
+        except Exception as e:
+            logger.error("Error bulk upserting %d resumes for owner %s: %s", len(ops), owner_id, e)
+            raise
+        else:
+            logger.info("Successfully bulk upserted %d resumes for owner: %s", len(ops), owner_id)
+
+        # one extra round trip resolves the _id of every upserted/updated document
+        owner_oid = self._to_objectid(owner_id)
+        phones = [f["phone"] for i, f in enumerate(filters) if f is not None and i not in failed]
+        stored = {}
+        if phones:
+            stored = {
+                doc["phone"]: doc
+                for doc in coll.find({"owner": owner_oid, "phone": {"$in": phones}}, {"_id": 1, "phone": 1})
+            }
+        docs = [
+            self._serialize_document(stored.get(f["phone"])) if f is not None and i not in failed else None
+            for i, f in enumerate(filters)
+        ]
+        return docs, failed
@@ -1,13 +1,33 @@
 # app/services/multi_job_ranking_service.py
 from typing import List, Dict, Any, Optional, Tuple, Union
 from collections import defaultdict
+from itertools import islice
+import json
 import logging
+from pydantic import TypeAdapter, ValidationError
+from pymongo.errors import PyMongoError
+from app.core.configs import config
 from app.services.mongoDB_service import MongoService
 from app.schemas import Resume, RankedResumeOut, RecommendedJob, JobDescription, Job
 from app.services.ranking_service import ResumeRanker  # or the actual import path of ResumeRanker
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
+# validates a whole list in one pydantic-core call instead of a Python loop of model_validate
+_resumes_adapter = TypeAdapter(List[Resume])
+
+# only the resume fields ResumeRanker reads (ids, name, summary, skills)
+RESUME_RANKING_PROJECTION = {
+    "owner": 1,
+    "fullName": 1,
+    "firstName": 1,
+    "lastName": 1,
+    "summary": 1,
+    "skills": 1,
+}
+# documents fetched per cursor round trip and validated per chunk
+RESUME_FETCH_BATCH_SIZE = 500
+
 class MultiJobRankingService:
     """
     For multiple Job (top-level) objects, rank resumes for each job,
@@ -55,23 +75,88 @@ class MultiJobRankingService:
             parts.append("Skills: " + ", ".join(map(str, skills)))
         return "\n\n".join(parts).strip() or (templateTitle or jobSummary or "")
 
-    def _load_and_validate_resumes(self, candidate_filter: Optional[Dict[str, Any]] = None) -> List[Resume]:
-        raw_docs = self.mongo.get_all_resumes(filter_query=candidate_filter or {}, limit=0)
+    @staticmethod
+    def _validate_resume_chunk(chunk: List[Dict[str, Any]]) -> List[Resume]:
+        try:
+            return _resumes_adapter.validate_python(chunk)
+        except ValidationError:
+            # some docs in this chunk are invalid: validate one by one so only those are skipped
+            pass
         resumes: List[Resume] = []
-        for d in raw_docs:
+        for d in chunk:
             try:
-                if isinstance(d, Resume):
-                    resumes.append(d)
-                else:
-                    if hasattr(Resume, "model_validate"):
-                        resumes.append(Resume.model_validate(d))
-                    else:
-                        resumes.append(Resume.parse_obj(d))
+                resumes.append(Resume.model_validate(d))
             except Exception:
                 logger.exception("Skipping invalid candidate doc (id=%s)", d.get("_id") or d.get("candidate_id"))
+        return resumes
+
+    def _load_and_validate_resumes(self, candidate_filter: Optional[Dict[str, Any]] = None) -> List[Resume]:
+        """
+        Stream the (projected) resumes from Mongo and validate them chunk by chunk,
+        so only one raw chunk is held in memory at a time.
+        """
+        cursor = self.mongo.iter_all_resumes(
+            filter_query=candidate_filter or {},
+            projection=RESUME_RANKING_PROJECTION,
+            batch_size=RESUME_FETCH_BATCH_SIZE,
+        )
+        resumes: List[Resume] = []
+        try:
+            while chunk := list(islice(cursor, RESUME_FETCH_BATCH_SIZE)):
+                resumes.extend(self._validate_resume_chunk(chunk))
+        except PyMongoError:
+            logger.exception("Error streaming resumes (filter=%r)", candidate_filter)
+            return []
         logger.info("Loaded %d valid resumes for ranking (filter=%r)", len(resumes), candidate_filter)
         return resumes
 
+    def _backfill_resume_embeddings(self) -> int:
+        """
+        Vector-search mode: embed and store resumes that have no embedding yet
+        (new, or re-parsed since the last pass). Returns how many were stored.
+        """
+        cursor = self.mongo.iter_all_resumes(
+            filter_query={config.RESUME_EMBEDDING_FIELD: {"$exists": False}},
+            projection=RESUME_RANKING_PROJECTION,
+            batch_size=RESUME_FETCH_BATCH_SIZE,
+        )
+        stored = 0
+        try:
+            while chunk := list(islice(cursor, RESUME_FETCH_BATCH_SIZE)):
+                resumes = [r for r in self._validate_resume_chunk(chunk) if r.id]
+                if not resumes:
+                    continue
+                vectors = self.ranker.encode_resumes(resumes).float().cpu().tolist()
+                self.mongo.set_resume_embeddings([(r.id, v) for r, v in zip(resumes, vectors)])
+                stored += len(resumes)
+        except PyMongoError:
+            logger.exception("Error backfilling resume embeddings")
+        logger.info("Stored embeddings for %d resumes", stored)
+        return stored
+
+    def _rank_job_in_db(
+        self, job_text: str, job_id: str, candidate_filter: Optional[Dict[str, Any]], top_k: int
+    ) -> List[RankedResumeOut]:
+        """Rank with Atlas $vectorSearch over the stored embeddings; only the top_k documents are transferred."""
+        query_vector = self.ranker.encode_texts([job_text])[0].float().cpu().tolist()
+        docs = self.mongo.vector_search_resumes(
+            index=config.RESUME_VECTOR_INDEX,
+            query_vector=query_vector,
+            limit=top_k,
+            filter_query=candidate_filter,
+            projection=RESUME_RANKING_PROJECTION,
+        )
+        ranked: List[RankedResumeOut] = []
+        for d in docs:
+            try:
+                resume = Resume.model_validate(d)
+            except Exception:
+                logger.exception("Skipping invalid candidate doc (id=%s)", d.get("_id"))
+                continue
+            # cosine index scores are (1 + cos) / 2; map back so scores match the in-Python ranking
+            ranked.append(self.ranker.to_ranked_out(resume, 2.0 * float(d.get("score", 0.0)) - 1.0, job_id))
+        return ranked
+
     def _extract_candidate_filters_and_cap(
         self, j_orig: Union[Job, Dict[str, Any], JobDescription]
     ) -> Tuple[Optional[Dict[str, Any]], int]:
@@ -168,6 +253,12 @@ class MultiJobRankingService:
 
         candidate_recs: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
         skipped_jobs = 0
+        # [resumes, embeddings] per distinct candidate filter, shared by every job of this pass
+        resume_pools: Dict[str, List[Any]] = {}
+
+        if config.RESUME_VECTOR_INDEX:
+            # ranking happens in Mongo; make sure every resume has a stored embedding first
+            self._backfill_resume_embeddings()
 
         for j_orig in jobs:
             job_id = ""
@@ -215,13 +306,6 @@ class MultiJobRankingService:
             job_candidate_filter, job_cap = self._extract_candidate_filters_and_cap(j_orig)
             logger.info("Job %s: candidate_filter=%r candidateCap=%d", job_id, job_candidate_filter, job_cap)
 
-            # fetch resumes applying job-specific filter
-            resumes = self._load_and_validate_resumes(candidate_filter=job_candidate_filter)
-            if not resumes:
-                logger.warning("No resumes returned for job %s (filter=%r); skipping job", job_id, job_candidate_filter)
-                skipped_jobs += 1
-                continue
-
             # convert job_cap to int and ensure positive
             try:
                 job_top_k = max(1, int(job_cap))
@@ -231,17 +315,44 @@ class MultiJobRankingService:
             # build job text
             job_text = self._jobtemplate_to_text(jd_normalized)
 
-            try:
-                ranked: List[RankedResumeOut] = self.ranker.rank_resumes_by_similarity(
-                    job_description=job_text,
-                    resumes=resumes,
-                    job_id=job_id,
-                    top_k=job_top_k,
-                )
-            except Exception:
-                logger.exception("Ranker failed for job_id=%s; skipping", job_id)
-                skipped_jobs += 1
-                continue
+            if config.RESUME_VECTOR_INDEX:
+                try:
+                    ranked: List[RankedResumeOut] = self._rank_job_in_db(job_text, job_id, job_candidate_filter, job_top_k)
+                except Exception:
+                    logger.exception("Vector search failed for job_id=%s; skipping", job_id)
+                    skipped_jobs += 1
+                    continue
+                if not ranked:
+                    logger.warning("No resumes returned for job %s (filter=%r); skipping job", job_id, job_candidate_filter)
+                    skipped_jobs += 1
+                    continue
+            else:
+                # fetch resumes applying job-specific filter
+                pool_key = json.dumps(job_candidate_filter or {}, sort_keys=True, default=str)
+                pool = resume_pools.get(pool_key)
+                if pool is None:
+                    pool = resume_pools[pool_key] = [self._load_and_validate_resumes(candidate_filter=job_candidate_filter), None]
+                resumes = pool[0]
+                if not resumes:
+                    logger.warning("No resumes returned for job %s (filter=%r); skipping job", job_id, job_candidate_filter)
+                    skipped_jobs += 1
+                    continue
+
+                try:
+                    # encode each resume set once per pass, not once per job
+                    if pool[1] is None:
+                        pool[1] = self.ranker.encode_resumes(resumes)
+                    ranked = self.ranker.rank_resumes_by_similarity(
+                        job_description=job_text,
+                        resumes=resumes,
+                        job_id=job_id,
+                        top_k=job_top_k,
+                        resume_embeddings=pool[1],
+                    )
+                except Exception:
+                    logger.exception("Ranker failed for job_id=%s; skipping", job_id)
+                    skipped_jobs += 1
+                    continue
 
             # collect recommendations
             for rec_idx, rr in enumerate(ranked, start=1):
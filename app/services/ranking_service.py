@@ -1,28 +1,58 @@
 from typing import List, Optional
 import torch
-from sentence_transformers import SentenceTransformer, util
+from sentence_transformers import SentenceTransformer
+from app.core.configs import config
 from app.schemas import Resume,RankedResumeOut, RecommendedJob, JobDescription
 from app.services.mongoDB_service import MongoService
 
+
+def load_embedding_model(model_name: str, device: str) -> SentenceTransformer:
+    """
+    Load the sentence-transformer used for ranking.
+    - EMBEDDING_BACKEND=onnx runs the forward pass on ONNX Runtime; EMBEDDING_ONNX_FILE can
+      select a dynamically quantized (int8) export shipped in the model repo.
+    - With the torch backend on CUDA the weights are cast to fp16.
+    """
+    if config.EMBEDDING_BACKEND == "onnx":
+        model_kwargs = {"file_name": config.EMBEDDING_ONNX_FILE} if config.EMBEDDING_ONNX_FILE else None
+        return SentenceTransformer(model_name, device=device, backend="onnx", model_kwargs=model_kwargs)
+    model = SentenceTransformer(model_name, device=device)
+    if device.startswith("cuda"):
+        model.half()
+    return model
+
+
+def resolve_embed_batch_size(device: str) -> int:
+    """EMBED_BATCH_SIZE if configured, otherwise a default sized for the hardware."""
+    if config.EMBED_BATCH_SIZE:
+        return config.EMBED_BATCH_SIZE
+    if device.startswith("cuda"):
+        return 64
+    # CPU: scale with the intra-op threads torch will use for the matmuls
+    return max(8, min(64, torch.get_num_threads() * 4))
+
+
 class ResumeRanker:
     def __init__(
         self,
         model_name: Optional[str] = None,
-        batch_size: int = 32,
+        batch_size: Optional[int] = None,
         device: Optional[str] = None,
+        model: Optional[SentenceTransformer] = None,
     ):
-        if model_name is None:
-            model_name = "Qwen/Qwen3-Embedding-0.6B"
+        """
+        - model: an already loaded SentenceTransformer to reuse (e.g. the app's /rank model)
+                 instead of loading another copy; model_name is ignored then.
+        """
+        if model is not None:
+            self.device = device if device else str(model.device)
+            self.model = model
         else:
-            model_name = model_name
-        self.model = SentenceTransformer(model_name)
-        self.batch_size = batch_size
-        self.device = device if device else ("cuda" if torch.cuda.is_available() else "cpu")
-        # try to move model (some wrappers ignore .to())
-        try:
-            self.model.to(self.device)
-        except Exception:
-            pass
+            if model_name is None:
+                model_name = config.EMBEDDING_MODEL
+            self.device = device if device else ("cuda" if torch.cuda.is_available() else "cpu")
+            self.model = load_embedding_model(model_name, self.device)
+        self.batch_size = batch_size or resolve_embed_batch_size(self.device)
 
     @staticmethod
     def _serialize_resume(r: Resume) -> str:
@@ -48,10 +78,12 @@ class ResumeRanker:
         return "\n".join(parts)
 
     def encode_texts(self, texts: List[str]):
+        # unit-normalized rows, so cosine similarity is a plain matmul
         embeddings = self.model.encode(
             texts,
             batch_size=self.batch_size,
             convert_to_tensor=True,
+            normalize_embeddings=True,
             show_progress_bar=False,
             device=self.device,
         )
@@ -63,12 +95,17 @@ class ResumeRanker:
             pass
         return embeddings
 
+    def encode_resumes(self, resumes: List[Resume]) -> torch.Tensor:
+        """(N, dim) unit-normalized embeddings; reusable across jobs ranking the same resumes."""
+        return self.encode_texts([self._serialize_resume(r) for r in resumes])
+
     def rank_resumes_by_similarity(
         self,
         job_description: str,
         resumes: List[Resume],
         job_id: Optional[str] = None,
         top_k: Optional[int] = None,
+        resume_embeddings: Optional[torch.Tensor] = None,
     ) -> List[RankedResumeOut]:
         """
         Rank resumes by cosine similarity to the job_description and return
@@ -77,50 +114,47 @@ class ResumeRanker:
         - job_id: optional id of the job (string). If provided, it will be used
                   in recommended_jobs.job_id for each returned resume.
         - top_k: optional limit on number of resumes to return.
+        - resume_embeddings: optional output of encode_resumes(resumes), to skip re-encoding.
         """
-        # Serialize resumes
-        resume_texts = [self._serialize_resume(r) for r in resumes]
-
         # Encode
         job_emb = self.encode_texts([job_description])           # (1, dim)
-        resume_embs = self.encode_texts(resume_texts)            # (N, dim)
-
-        # Cosine similarities (1, N) -> squeeze -> (N,)
-        cos_scores = util.cos_sim(job_emb, resume_embs).squeeze(0)
-        scores_cpu = cos_scores.cpu()
-
-        # Sort indices by descending score
-        sorted_indices = torch.argsort(scores_cpu, descending=True).tolist()
-        if top_k is not None:
-            sorted_indices = sorted_indices[:top_k]
-
-        out: List[RankedResumeOut] = []
-        for rank_position, i in enumerate(sorted_indices, start=1):
-            r = resumes[i]
-            score = float(scores_cpu[i].item())
-
-            # best-effort extraction of ids and name fields
-            candidate_id = getattr(r, "id", None) 
-            owner = getattr(r, "owner", None)
-
-            # name resolution: prefer fullName, otherwise join firstName + lastName
-            name = getattr(r, "fullName", None)
-            if not name:
-                fn = getattr(r, "firstName", None) or ""
-                ln = getattr(r, "lastName", None) or ""
-                name = (fn + " " + ln).strip() or None
-
-            # Build recommended_jobs list — currently single job (rank=1)
-            jid = job_id if job_id is not None else "unknown"
-            recommended_jobs = [RecommendedJob(job_id=str(jid), score=score, rank=1)]
-
-            out.append(
-                RankedResumeOut(
-                    candidate_id=str(candidate_id) if candidate_id is not None else None,
-                    owner=str(owner) if owner is not None else None,
-                    name=name,
-                    recommended_jobs=recommended_jobs,
-                )
-            )
-
-        return out
+        if resume_embeddings is None:
+            resume_embeddings = self.encode_resumes(resumes)     # (N, dim)
+
+        # Cosine similarities of unit vectors: (N, dim) @ (dim,) -> (N,)
+        scores_cpu = (resume_embeddings @ job_emb[0]).float().cpu()
+
+        # top-k by descending score (partial selection instead of a full sort)
+        k = len(resumes) if top_k is None else min(top_k, len(resumes))
+        sorted_indices = torch.topk(scores_cpu, k).indices.tolist()
+
+        return [
+            self.to_ranked_out(resumes[i], float(scores_cpu[i].item()), job_id)
+            for i in sorted_indices
+        ]
+
+    @staticmethod
+    def to_ranked_out(r: Resume, score: float, job_id: Optional[str] = None) -> RankedResumeOut:
+        """Build the RankedResumeOut for one scored resume."""
+        # best-effort extraction of ids and name fields
+        candidate_id = getattr(r, "id", None)
+        owner = getattr(r, "owner", None)
+
+        # name resolution: prefer fullName, otherwise join firstName + lastName
+        name = getattr(r, "fullName", None)
+        if not name:
+            fn = getattr(r, "firstName", None) or ""
+            ln = getattr(r, "lastName", None) or ""
+            name = (fn + " " + ln).strip() or None
+
+        # Build recommended_jobs list — currently single job (rank=1)
+        # values are produced here with the right types, so skip re-validation via model_construct
+        jid = job_id if job_id is not None else "unknown"
+        recommended_jobs = [RecommendedJob.model_construct(job_id=str(jid), score=score, rank=1)]
+
+        return RankedResumeOut.model_construct(
+            candidate_id=str(candidate_id) if candidate_id is not None else None,
+            owner=str(owner) if owner is not None else None,
+            name=name,
+            recommended_jobs=recommended_jobs,
+        )
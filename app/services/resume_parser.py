@@ -1,14 +1,35 @@
 import asyncio
 import logging
 import random
-from typing import Optional, Any, Dict
+from typing import Optional, Any, Dict, List, Tuple
 import google.genai as genai
+import httpx
+from google.genai import errors as genai_errors
+from pymongo.errors import AutoReconnect
 from app.schemas import CandidateResume
 from app.services.mongoDB_service import MongoService
 
 logger = logging.getLogger("Resume Parser")
 logger.setLevel(logging.INFO)
 
+# exception types that signal a temporary upstream problem (5xx / overloaded model,
+# network timeouts, Mongo failover) and are worth retrying
+TRANSIENT_ERRORS = (
+    genai_errors.ServerError,
+    httpx.TransportError,
+    AutoReconnect,
+    TimeoutError,
+    ConnectionError,
+)
+
+
+def is_transient_error(exc: BaseException) -> bool:
+    """Classify an exception as transient by type rather than by its message."""
+    if isinstance(exc, TRANSIENT_ERRORS):
+        return True
+    # 429 RESOURCE_EXHAUSTED (rate limited) arrives as a ClientError
+    return isinstance(exc, genai_errors.ClientError) and exc.code == 429
+
 
 class ResumeProcessor:
     """
@@ -36,27 +57,24 @@ class ResumeProcessor:
     async def _run_with_retries(self, func, *args, **kwargs):
         """Generic retry loop for functions that may raise transient errors."""
         attempt = 0
+        prev_sleep = self.base_backoff
         while True:
             try:
                 # Run blocking function in thread
                 return await asyncio.to_thread(func, *args, **kwargs)
             except Exception as exc:
                 attempt += 1
-                msg = str(exc).lower()
-                is_transient = False
-
-                # heuristics to detect transient GenAI/unavailable errors
-                if "503" in msg or "unavailable" in msg or "model is overloaded" in msg or "model overloaded" in msg:
-                    is_transient = True
+                is_transient = is_transient_error(exc)
 
                 if not is_transient or attempt > self.max_retries:
-                    logger.exception("Non-retriable error or max retries exceeded")
+                    # re-raised to the caller, which owns the traceback; only format it here when debugging
+                    logger.warning("Non-retriable error or max retries exceeded: %s", exc,
+                                   exc_info=logger.isEnabledFor(logging.DEBUG))
                     raise
 
-                # exponential backoff with jitter
-                backoff = min(self.base_backoff * (2 ** (attempt - 1)), self.max_backoff)
-                jitter = random.uniform(0, backoff * 0.2)
-                sleep_for = backoff + jitter
+                # decorrelated jitter, so concurrent calls don't retry in lockstep
+                sleep_for = min(self.max_backoff, random.uniform(self.base_backoff, prev_sleep * 3))
+                prev_sleep = sleep_for
                 logger.warning(
                     "Transient error detected (attempt %d/%d). Sleeping %.2fs before retrying. Error: %s",
                     attempt,
@@ -110,10 +128,32 @@ class ResumeProcessor:
 
         return await asyncio.to_thread(_upsert)
 
-    async def process_resume_file(self, local_path: str, owner_id: str, prompt: str) -> Dict:
-        """Full pipeline: upload -> generate -> validate -> store. Returns DB doc (or raises)."""
+    async def upsert_many_to_db(
+        self, owner_id: str, parsed_resumes: List[CandidateResume]
+    ) -> Tuple[List[Optional[Dict]], Dict[int, str]]:
+        """
+        Upsert a batch of resumes with one bulk_write (runs blocking).
+        Returns (docs aligned with input, {input index: error} for rejected items);
+        see MongoService.bulk_upsert_resumes.
+        """
+        def _upsert_many():
+            mongo = MongoService()
+            try:
+                return mongo.bulk_upsert_resumes(owner_id=owner_id, parsed_items=parsed_resumes)
+            finally:
+                mongo.close()
+
+        return await asyncio.to_thread(_upsert_many)
+
+    async def parse_resume_file(self, local_path: str, prompt: str) -> Tuple[Any, CandidateResume]:
+        """Parse-only pipeline: upload -> generate -> validate. Returns (uploaded_doc, resume_model)."""
         uploaded_doc = await self.upload_file(local_path)
         resume_model = await self.generate_resume_json(uploaded_doc, prompt)
+        return uploaded_doc, resume_model
+
+    async def process_resume_file(self, local_path: str, owner_id: str, prompt: str) -> Dict:
+        """Full pipeline: upload -> generate -> validate -> store. Returns DB doc (or raises)."""
+        uploaded_doc, resume_model = await self.parse_resume_file(local_path, prompt)
         saved_doc = await self.upsert_to_db(owner_id=owner_id, parsed_resume=resume_model)
         return {
             "uploaded_doc": getattr(uploaded_doc, "name", None),
@@ -1,9 +1,13 @@
 import logging
 import uvicorn
 from contextlib import asynccontextmanager
+from cachetools import TTLCache
 from fastapi import FastAPI
-from sentence_transformers import SentenceTransformer
-from app import ranker, scheduler,parser, config, MongoService, AgentRegistry, PeriodicResumeRanker
+from fastapi.responses import ORJSONResponse
+from app.services.ranking_service import load_embedding_model, resolve_embed_batch_size
+from app.services.dispatch_service import close_lkapi
+from app.services.meeting_service import close_tiny_client
+from app import ranker, scheduler,parser, config, MongoService, agent_registry, PeriodicResumeRanker, ResumeRanker, InterviewManager
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
 logger = logging.getLogger(__name__)
@@ -18,20 +22,35 @@ async def lifespan(app: FastAPI):
     logger.info("Application startup (lifespan)...")
     # device = "cuda" if torch.cuda.is_available() else "cpu"
     device = "cpu"
-    logger.info(f"Loading embedding model '{config.EMBEDDING_MODEL}' on device '{device}'")
-    app.state.model = SentenceTransformer(config.EMBEDDING_MODEL, device=device)
-    logger.info("Embedding model loaded successfully.")
+    logger.info(f"Loading embedding model '{config.EMBEDDING_MODEL}' on device '{device}' (backend={config.EMBEDDING_BACKEND})")
+    app.state.model = load_embedding_model(config.EMBEDDING_MODEL, device)
+    batch_size = resolve_embed_batch_size(device)
+    logger.info(f"Embedding model loaded successfully (batch_size={batch_size}).")
+    # one ResumeRanker over the loaded model, used by /rank and the periodic ranker
+    app.state.resume_ranker = ResumeRanker(model=app.state.model, batch_size=batch_size)
 
-    app.state.mongo_service = MongoService(db_name="algo-hr")
+    # single MongoService (one connection pool) shared by every request handler
+    app.state.mongo_service = MongoService(db_name="algojobs")
+    app.state.mongo_service.ensure_indexes()
     logger.info("MongoDB service initialized.")
 
-    app.state.agent_registry=AgentRegistry(30)
+    app.state.interview_manager = InterviewManager(mongo_service=app.state.mongo_service)
+
+    # the module-level registry the interview manager and scheduler routes start/stop agents on,
+    # so shutdown below actually stops those agents
+    app.state.agent_registry = agent_registry
     logger.info("Agent registry initialized.")
 
+    # ResumeProcessor instances keyed by api_key, shared across parser requests. api_key is client
+    # supplied, so the cache is bounded and entries expire (dropping the client and the key with it)
+    app.state.processors = TTLCache(maxsize=config.GENAI_CLIENT_CACHE_SIZE, ttl=config.GENAI_CLIENT_CACHE_TTL)
+
     app.state.periodic_ranker = PeriodicResumeRanker(
         interval_seconds=3 * 60 * 60,
         start_hour_ist=9,
         end_hour_ist=18,
+        mongo=app.state.mongo_service,
+        ranker=app.state.resume_ranker,
     )
     app.state.periodic_ranker.start()
 
@@ -41,6 +60,7 @@ async def lifespan(app: FastAPI):
         # SHUTDOWN
         logger.info("Application shutdown (lifespan)...")
         app.state.model = None
+        app.state.resume_ranker = None
         try:
             await app.state.periodic_ranker.stop()
         except Exception:
@@ -49,6 +69,14 @@ async def lifespan(app: FastAPI):
             await app.state.agent_registry.shutdown()
         except Exception:
             logger.exception("Error while shutting down agent registry")
+        try:
+            await close_lkapi()
+        except Exception:
+            logger.exception("Error while closing LiveKit API client")
+        try:
+            await close_tiny_client()
+        except Exception:
+            logger.exception("Error while closing TinyURL client")
         try:
             app.state.mongo_service.close()
         except Exception:
@@ -59,7 +87,8 @@ app = FastAPI(
     title="AI HR Service",
     description="An API for ranking resumes and scheduling candidate interviews.",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # --- API Routers ---